@@ -10,16 +10,55 @@ from dsrag.database.chunk import ChunkDB
 from dsrag.database.vector import VectorDB
 from dsrag.custom_term_mapping import annotate_chunks
 import logging
+import random
 import time
+import numpy as np
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+# HTTP status codes that mean "try again later" rather than "this request is bad"
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# Provider SDK exceptions that don't carry a status code, matched by name so no SDK has to be imported
+TRANSIENT_ERROR_NAMES = {"RateLimitError", "APIConnectionError", "APITimeoutError", "ServiceUnavailableError"}
+
+def is_transient_error(e: Exception) -> bool:
+    """Whether an embedding or LLM API error is worth retrying (rate limits, timeouts, server errors)."""
+    if isinstance(e, (TimeoutError, ConnectionError)) or type(e).__name__ in TRANSIENT_ERROR_NAMES:
+        return True
+    status_code = getattr(e, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(e, "response", None), "status_code", None)
+    return status_code in TRANSIENT_STATUS_CODES
+
+def call_with_retry(func, *args, max_retries: int = 4, initial_delay: float = 1.0, backoff_factor: float = 2.0, **kwargs):
+    """
+    Call func, retrying transient API errors with exponential backoff and jitter.
+    Any other error is raised straight away, as is a transient one on the last attempt.
+    """
+    ingestion_logger = logging.getLogger("dsrag.ingestion")
+    current_delay = initial_delay
+    for attempt in range(max_retries):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if attempt == max_retries - 1 or not is_transient_error(e):
+                raise
+            # jitter keeps concurrent workers that were rate limited together from retrying together
+            delay = current_delay + random.uniform(0, current_delay)
+            ingestion_logger.warning(f"Transient error, retrying in {delay:.2f} seconds: {e}", extra={
+                "retry_attempt": attempt + 1,
+                "function": getattr(func, "__qualname__", repr(func))
+            })
+            time.sleep(delay)
+            current_delay *= backoff_factor
+
 def process_section_summary(section, auto_context_model, document_title, auto_context_config, language, base_extra, i):
     ingestion_logger = logging.getLogger("dsrag.ingestion")
     if auto_context_config.get("get_section_summaries", False):
         section_summarization_guidance = auto_context_config.get("section_summarization_guidance", "")
         
         section_summary_start_time = time.perf_counter()
-        section_summary = get_section_summary(
+        section_summary = call_with_retry(
+            get_section_summary,
             auto_context_model=auto_context_model,
             section_text=section["content"],
             document_title=document_title,
@@ -55,7 +94,8 @@ def auto_context(kb_id: str, auto_context_model: LLM, sections, chunks, text, do
         document_title_guidance = auto_context_config.get(
             "document_title_guidance", ""
         )
-        document_title = get_document_title(
+        document_title = call_with_retry(
+            get_document_title,
             auto_context_model=auto_context_model,
             document_text=text,
             document_title_guidance=document_title_guidance,
@@ -64,23 +104,26 @@ def auto_context(kb_id: str, auto_context_model: LLM, sections, chunks, text, do
     elif not document_title:
         document_title = doc_id
 
-    if auto_context_config.get("get_document_summary", True):
+    def summarize_document() -> str:
+        if not auto_context_config.get("get_document_summary", True):
+            return ""
         document_summarization_guidance = auto_context_config.get("document_summarization_guidance", "")
-        document_summary = get_document_summary(
+        return call_with_retry(
+            get_document_summary,
             auto_context_model,
             text,
             document_title=document_title,
             document_summarization_guidance=document_summarization_guidance,
             language=language
         )
-    else:
-        document_summary = ""
 
     # get section summaries in parallel
     if auto_context_config.get("get_section_summaries", False):
         # Get concurrent workers, default to 5 if not specified
         max_concurrent_workers = auto_context_config.get("llm_max_concurrent_requests", 5)
-        with ThreadPoolExecutor(max_workers=min(max_concurrent_workers, len(sections))) as executor:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrent_workers, len(sections) + 1))) as executor:
+            # the document summary only needs the title, so it runs alongside the section summaries
+            document_summary_future = executor.submit(summarize_document)
             future_to_section = {
                 executor.submit(
                     process_section_summary, 
@@ -104,13 +147,25 @@ def auto_context(kb_id: str, auto_context_model: LLM, sections, chunks, text, do
                     ingestion_logger.error(f"Error processing section {i}: {str(e)}", 
                                           extra={**base_extra, "section_index": i})
                     sections[i]["summary"] = ""
+            document_summary = document_summary_future.result()
     else:
+        document_summary = summarize_document()
         # If not generating summaries, just set empty summaries
         for section in sections:
             section["summary"] = ""
 
-    # add document title, document summary, and section summaries to the chunks
-    for chunk in chunks:
+    # custom term mapping
+    custom_term_mapping = auto_context_config.get("custom_term_mapping", None)
+    if custom_term_mapping:
+        raw_chunks = [chunk["content"] for chunk in chunks] # need to convert chunks to list of strings
+        annotated_chunks = annotate_chunks(raw_chunks, custom_term_mapping)
+
+    # add document title, document summary, and section summaries to the chunks, and prepare the chunks
+    # for embedding by prepending the chunk headers. Every chunk in a section gets the same header, so it's
+    # built once per section rather than once per chunk.
+    chunk_headers = {}
+    chunks_to_embed = []
+    for i, chunk in enumerate(chunks):
         chunk["document_title"] = document_title
         chunk["document_summary"] = document_summary
         section_index = chunk["section_index"]
@@ -118,24 +173,20 @@ def auto_context(kb_id: str, auto_context_model: LLM, sections, chunks, text, do
             chunk["section_title"] = sections[section_index]["title"]
             chunk["section_summary"] = sections[section_index]["summary"]
 
-    # custom term mapping
-    if auto_context_config.get("custom_term_mapping", None):
-        raw_chunks = [chunk["content"] for chunk in chunks] # need to convert chunks to list of strings
-        annotated_chunks = annotate_chunks(raw_chunks, auto_context_config["custom_term_mapping"])
-
-    # prepare the chunks for embedding by prepending the chunk headers
-    chunks_to_embed = []
-    for i, chunk in enumerate(chunks):
-        chunk_header = get_chunk_header(
-            document_title=chunk["document_title"],
-            document_summary=chunk["document_summary"],
-            section_title=chunk["section_title"],
-            section_summary=chunk["section_summary"],
-        )
-        if auto_context_config.get("custom_term_mapping", None):
+        if section_index is not None and section_index in chunk_headers:
+            chunk_header = chunk_headers[section_index]
+        else:
+            chunk_header = get_chunk_header(
+                document_title=chunk["document_title"],
+                document_summary=chunk["document_summary"],
+                section_title=chunk["section_title"],
+                section_summary=chunk["section_summary"],
+            )
+            if section_index is not None:
+                chunk_headers[section_index] = chunk_header
+        if custom_term_mapping:
             chunk["content"] = annotated_chunks[i] # override the chunk content with the annotated content if custom term mapping is used
-        chunk_to_embed = f"{chunk_header}\n\n{chunk['content']}"
-        chunks_to_embed.append(chunk_to_embed)
+        chunks_to_embed.append(f"{chunk_header}\n\n{chunk['content']}")
 
     step_duration = time.perf_counter() - step_start_time
     ingestion_logger.debug("AutoContext complete", extra={
@@ -147,15 +198,26 @@ def auto_context(kb_id: str, auto_context_model: LLM, sections, chunks, text, do
 
     return chunks, chunks_to_embed
 
-def get_embeddings(embedding_model: Embedding, chunks_to_embed):
+def get_embeddings(embedding_model: Embedding, chunks_to_embed) -> np.ndarray:
     # embed the chunks - if the document is long, we need to get the embeddings in chunks
-    chunk_embeddings = []
+    if not chunks_to_embed:
+        return np.empty((0, embedding_model.dimension or 0), dtype=np.float32)
+
+    # one contiguous float32 array of shape (num_chunks, dimension), rather than a list of lists of boxed floats.
+    # It's sized from the first batch, since not every model's declared dimension is reliable.
+    chunk_embeddings = None
     for i in range(0, len(chunks_to_embed), 50):
-        chunk_embeddings += embedding_model.get_embeddings(chunks_to_embed[i:i+50], input_type="document")
+        batch = np.asarray(
+            call_with_retry(embedding_model.get_embeddings, chunks_to_embed[i:i+50], input_type="document"),
+            dtype=np.float32
+        )
+        if chunk_embeddings is None:
+            chunk_embeddings = np.empty((len(chunks_to_embed), batch.shape[1]), dtype=np.float32)
+        chunk_embeddings[i:i+len(batch)] = batch
 
     return chunk_embeddings
 
-def add_chunks_to_db(chunk_db: ChunkDB, chunks, chunks_to_embed, chunk_embeddings, metadata, doc_id, supp_id):
+def add_chunks_to_db(chunk_db: ChunkDB, chunks, chunks_to_embed, chunk_embeddings: np.ndarray, metadata, doc_id, supp_id):
     # add the chunks to the chunk database
     assert len(chunks) == len(chunk_embeddings) == len(chunks_to_embed)
     chunk_db.add_document(
@@ -177,7 +239,7 @@ def add_chunks_to_db(chunk_db: ChunkDB, chunks, chunks_to_embed, chunk_embedding
         metadata
     )
 
-def add_vectors_to_db(vector_db: VectorDB, chunks, chunk_embeddings, metadata, doc_id):
+def get_vector_metadata(chunks, metadata, doc_id):
     # create metadata list to add to the vector database
     vector_metadata = []
     for i, chunk in enumerate(chunks):
@@ -205,6 +267,10 @@ def add_vectors_to_db(vector_db: VectorDB, chunks, chunk_embeddings, metadata, d
                 **metadata
             }
         )
+    return vector_metadata
+
+def add_vectors_to_db(vector_db: VectorDB, chunks, chunk_embeddings: np.ndarray, metadata, doc_id):
+    vector_metadata = get_vector_metadata(chunks, metadata, doc_id)
 
     # add the vectors and metadata to the vector database
     vector_db.add_vectors(vectors=chunk_embeddings, metadata=vector_metadata)
\ No newline at end of file
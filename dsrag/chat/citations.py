@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Iterable
 import instructor
 
 class Citation(BaseModel):
@@ -67,26 +67,35 @@ def format_sources_for_context(search_results: list[dict], kb_id: str, file_syst
     
     return "\n\n".join(context_parts), all_doc_ids
 
-def convert_elements_to_page_content(elements: list[dict], kb_id: str, doc_id: str, file_system) -> None:
+def convert_elements_to_page_content(elements: Iterable[dict], kb_id: str, doc_id: str, file_system) -> None:
     """
     Convert elements to page content and save it using the page content methods.
     This should be called when a document is first added to the knowledge base.
     Only processes documents where elements have page numbers.
+    Elements can be any iterable; only one page's content is held in memory at a time.
     """
     # Check if this document has page numbers
-    if not elements or "page_number" not in elements[0]:
+    elements = iter(elements)
+    first_element = next(elements, None)
+    if first_element is None or "page_number" not in first_element:
         print(f"No page numbers found for document {doc_id}")
         return
 
-    # Group elements by page
-    pages = {}
-    for element in elements:
-        page_num = element["page_number"]
-        if page_num not in pages:
-            pages[page_num] = []
-        pages[page_num].append(element["content"])
+    saved_pages = set()
+
+    def save_page(page_num: int, contents: list[str]):
+        if page_num in saved_pages:
+            # elements for this page weren't contiguous - add to what was already saved
+            contents = [file_system.load_page_content(kb_id, doc_id, page_num)] + contents
+        file_system.save_page_content(kb_id, doc_id, page_num, "\n".join(contents))
+        saved_pages.add(page_num)
 
-    # Save each page's content
-    for page_num, contents in pages.items():
-        page_content = "\n".join(contents)
-        file_system.save_page_content(kb_id, doc_id, page_num, page_content)
\ No newline at end of file
+    # Elements are in page order, so each page is saved as soon as the next one starts
+    page_num, contents = first_element["page_number"], [first_element["content"]]
+    for element in elements:
+        if element["page_number"] != page_num:
+            save_page(page_num, contents)
+            page_num, contents = element["page_number"], []
+        contents.append(element["content"])
+    save_page(page_num, contents)
+    file_system.mark_page_content_complete(kb_id, doc_id, len(saved_pages))
\ No newline at end of file
@@ -3,7 +3,7 @@ import pickle
 from typing import Any, Optional, cast
 
 from dsrag.database.chunk.db import ChunkDB
-from dsrag.database.chunk.types import FormattedDocument
+from dsrag.database.chunk.types import FormattedDocument, ChunkRow
 
 
 class BasicChunkDB(ChunkDB):
@@ -51,6 +51,28 @@ class BasicChunkDB(ChunkDB):
             )
         return None, None
 
+    def get_chunks_range(self, doc_id: str, chunk_start: int, chunk_end: int) -> list[ChunkRow]:
+        document = self.data.get(doc_id, {})
+        return [
+            ChunkRow(
+                chunk_index=chunk_index,
+                chunk_text=document[chunk_index]["chunk_text"],
+                is_visual=document[chunk_index].get("is_visual", False),
+                chunk_page_start=document[chunk_index].get("chunk_page_start", None),
+                chunk_page_end=document[chunk_index].get("chunk_page_end", None),
+            )
+            for chunk_index in range(chunk_start, chunk_end)
+            if chunk_index in document
+        ]
+
+    def segment_has_visual(self, doc_id: str, chunk_start: int, chunk_end: int) -> bool:
+        document = self.data.get(doc_id, {})
+        return any(
+            document[chunk_index].get("is_visual", False)
+            for chunk_index in range(chunk_start, chunk_end)
+            if chunk_index in document
+        )
+
     def get_document(
         self, doc_id: str, include_content: bool = False
     ) -> Optional[FormattedDocument]:
@@ -60,10 +82,8 @@ class BasicChunkDB(ChunkDB):
 
             full_document_string = ""
             if include_content:
-                # Concatenate the chunks into a single string
-                for _, chunk in document.items():
-                    # Join each chunk text with a new line character
-                    full_document_string += chunk["chunk_text"] + "\n"
+                # Concatenate the chunks into a single string, each followed by a new line character
+                full_document_string = "".join(chunk["chunk_text"] + "\n" for chunk in document.values())
 
             return FormattedDocument(
                 id=doc_id,
@@ -139,7 +159,7 @@ class BasicChunkDB(ChunkDB):
 
     def save(self):
         with open(self.storage_path, "wb") as f:
-            pickle.dump(self.data, f)
+            pickle.dump(self.data, f, protocol=pickle.HIGHEST_PROTOCOL)
 
     def delete(self):
         if os.path.exists(self.storage_path):
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Any, Optional
 
-from dsrag.database.chunk.types import FormattedDocument
+from dsrag.database.chunk.types import FormattedDocument, ChunkRow
 
 
 class ChunkDB(ABC):
@@ -62,6 +62,37 @@ class ChunkDB(ABC):
         """
         pass
 
+    def get_chunks_range(self, doc_id: str, chunk_start: int, chunk_end: int) -> list[ChunkRow]:
+        """
+        Retrieve the text, is_visual flag and page numbers of the chunks from chunk_start up to (but not
+        including) chunk_end, in chunk_index order. Chunks that don't exist are left out.
+
+        This default makes several calls per chunk; subclasses should override it with a single query.
+        """
+        rows = []
+        for chunk_index in range(chunk_start, chunk_end):
+            chunk_text = self.get_chunk_text(doc_id, chunk_index)
+            if chunk_text is None:
+                continue
+            chunk_page_start, chunk_page_end = self.get_chunk_page_numbers(doc_id, chunk_index)
+            rows.append(ChunkRow(
+                chunk_index=chunk_index,
+                chunk_text=chunk_text,
+                is_visual=self.get_is_visual(doc_id, chunk_index),
+                chunk_page_start=chunk_page_start,
+                chunk_page_end=chunk_page_end,
+            ))
+        return rows
+
+    def segment_has_visual(self, doc_id: str, chunk_start: int, chunk_end: int) -> bool:
+        """
+        Check whether any of the chunks from chunk_start up to (but not including) chunk_end is visual.
+
+        This default checks one chunk at a time and stops at the first visual chunk; subclasses should
+        override it with a single query.
+        """
+        return any(self.get_is_visual(doc_id, chunk_index) for chunk_index in range(chunk_start, chunk_end))
+
     @abstractmethod
     def get_document(self, doc_id: str) -> Optional[FormattedDocument]:
         """
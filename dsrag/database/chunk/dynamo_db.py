@@ -4,7 +4,7 @@ from decimal import Decimal
 import time
 from dsrag.utils.imports import boto3
 from dsrag.database.chunk.db import ChunkDB
-from dsrag.database.chunk.types import FormattedDocument
+from dsrag.database.chunk.types import FormattedDocument, ChunkRow
 
 
 def get_key():
@@ -384,6 +384,33 @@ class DynamoDB(ChunkDB):
         else:
             return None, None
 
+    def get_chunks_range(self, doc_id: str, chunk_start: int, chunk_end: int) -> list[ChunkRow]:
+        # Retrieve all the chunks in the range with one query on the (doc_id, chunk_index) key
+        if chunk_end <= chunk_start:
+            return []
+        dynamo_db = self.create_dynamo_client()
+        table = dynamo_db.Table(self.table_name)
+        query_kwargs = {
+            'KeyConditionExpression': get_key()('doc_id').eq(doc_id) & get_key()('chunk_index').between(chunk_start, chunk_end - 1),
+            'ProjectionExpression': 'chunk_index, chunk_text, is_visual, chunk_page_start, chunk_page_end',
+        }
+        response = table.query(**query_kwargs)
+        items = response.get('Items', [])
+        while 'LastEvaluatedKey' in response:
+            response = table.query(**query_kwargs, ExclusiveStartKey=response['LastEvaluatedKey'])
+            items.extend(response.get('Items', []))
+
+        return [
+            ChunkRow(
+                chunk_index=item['chunk_index'],
+                chunk_text=item.get('chunk_text'),
+                is_visual=item.get('is_visual'),
+                chunk_page_start=item.get('chunk_page_start'),
+                chunk_page_end=item.get('chunk_page_end'),
+            )
+            for item in process_items(items)
+        ]
+
     def get_document_title(self, doc_id: str, chunk_index: int) -> Optional[str]:
         dynamo_db = self.create_dynamo_client()
         table = dynamo_db.Table(self.table_name)
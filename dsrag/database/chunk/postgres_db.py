@@ -2,11 +2,12 @@ import time
 from typing import Any, Optional
 
 from dsrag.database.chunk.db import ChunkDB
-from dsrag.database.chunk.types import FormattedDocument
+from dsrag.database.chunk.types import FormattedDocument, ChunkRow
 from dsrag.utils.imports import LazyLoader
 
 # Lazy load PostgreSQL dependencies
 psycopg2 = LazyLoader("psycopg2", "psycopg2-binary")
+psycopg2_extras = LazyLoader("psycopg2.extras", "psycopg2-binary")
 
 
 class PostgresChunkDB(ChunkDB):
@@ -84,34 +85,34 @@ class PostgresChunkDB(ChunkDB):
         # Turn the metadata object into a string
         metadata = str(metadata)
 
-        # Get the data from the dictionary
+        columns = [
+            'doc_id', 'document_title', 'document_summary', 'section_title', 'section_summary',
+            'chunk_text', 'chunk_page_start', 'chunk_page_end', 'is_visual', 'chunk_index',
+            'chunk_length', 'created_on', 'supp_id', 'metadata'
+        ]
+        rows = []
         for chunk_index, chunk in chunks.items():
             chunk_text = chunk.get("chunk_text", "")
-            chunk_length = len(chunk_text)
-
-            values_dict = {
-                'doc_id': doc_id,
-                'document_title': chunk.get("document_title", ""),
-                'document_summary': chunk.get("document_summary", ""),
-                'section_title': chunk.get("section_title", ""),
-                'section_summary': chunk.get("section_summary", ""),
-                'chunk_text': chunk.get("chunk_text", ""),
-                'chunk_page_start': chunk.get("chunk_page_start", None),
-                'chunk_page_end': chunk.get("chunk_page_end", None),
-                'is_visual': chunk.get("is_visual", False),
-                'chunk_index': chunk_index,
-                'chunk_length': chunk_length,
-                'created_on': created_on,
-                'supp_id': supp_id,
-                'metadata': metadata
-            }
-
-            # Generate the column names and placeholders
-            columns = ', '.join(values_dict.keys())
-            placeholders = ', '.join(['%s'] * len(values_dict))
-
-            sql = f"INSERT INTO {self.table_name} ({columns}) VALUES ({placeholders})"
-            cur.execute(sql, tuple(values_dict.values()))
+            rows.append((
+                doc_id,
+                chunk.get("document_title", ""),
+                chunk.get("document_summary", ""),
+                chunk.get("section_title", ""),
+                chunk.get("section_summary", ""),
+                chunk_text,
+                chunk.get("chunk_page_start", None),
+                chunk.get("chunk_page_end", None),
+                chunk.get("is_visual", False),
+                chunk_index,
+                len(chunk_text),
+                created_on,
+                supp_id,
+                metadata
+            ))
+
+        # Insert all chunks with multi-row VALUES statements instead of one round trip per chunk
+        sql = f"INSERT INTO {self.table_name} ({', '.join(columns)}) VALUES %s"
+        psycopg2_extras.execute_values(cur, sql, rows)
 
         conn.commit()
         conn.close()
@@ -160,12 +161,9 @@ class PostgresChunkDB(ChunkDB):
         # Turn the results into an object where the columns are keys
         full_document_string = ""
         if include_content:
-            # Concatenate the chunks into a single string
-            for result in results:
-                # Join each chunk text with a new line character
-                full_document_string += result[columns.index("chunk_text")] + "\n"
-            # Remove the last new line character
-            full_document_string = full_document_string[:-1]
+            # Join the chunk texts into a single string with new line characters
+            chunk_text_index = columns.index("chunk_text")
+            full_document_string = "\n".join(result[chunk_text_index] for result in results)
 
         supp_id = results[0][columns.index("supp_id")]
         title = results[0][columns.index("document_title")]
@@ -244,6 +242,53 @@ class PostgresChunkDB(ChunkDB):
             return result
         return None
 
+    def get_chunks_range(self, doc_id: str, chunk_start: int, chunk_end: int) -> list[ChunkRow]:
+        # Retrieve all the chunks in the range with one query
+        conn = psycopg2.connect(
+            dbname=self.database,
+            user=self.username,
+            password=self.password,
+            host=self.host,
+            port=self.port
+        )
+        cur = conn.cursor()
+        cur.execute(
+            f"SELECT chunk_index, chunk_text, is_visual, chunk_page_start, chunk_page_end FROM {self.table_name} "
+            "WHERE doc_id=%s AND chunk_index>=%s AND chunk_index<%s ORDER BY chunk_index",
+            (doc_id, chunk_start, chunk_end)
+        )
+        results = cur.fetchall()
+        conn.close()
+        return [
+            ChunkRow(
+                chunk_index=chunk_index,
+                chunk_text=chunk_text,
+                is_visual=is_visual,
+                chunk_page_start=chunk_page_start,
+                chunk_page_end=chunk_page_end,
+            )
+            for chunk_index, chunk_text, is_visual, chunk_page_start, chunk_page_end in results
+        ]
+
+    def segment_has_visual(self, doc_id: str, chunk_start: int, chunk_end: int) -> bool:
+        # Look for a single visual chunk in the range, rather than reading every chunk's flag
+        conn = psycopg2.connect(
+            dbname=self.database,
+            user=self.username,
+            password=self.password,
+            host=self.host,
+            port=self.port
+        )
+        cur = conn.cursor()
+        cur.execute(
+            f"SELECT 1 FROM {self.table_name} "
+            "WHERE doc_id=%s AND chunk_index>=%s AND chunk_index<%s AND is_visual LIMIT 1",
+            (doc_id, chunk_start, chunk_end)
+        )
+        result = cur.fetchone()
+        conn.close()
+        return result is not None
+
     def get_document_title(self, doc_id: str, chunk_index: int) -> Optional[str]:
         # Retrieve the document title from the sqlite table
         conn = psycopg2.connect(
@@ -6,7 +6,7 @@ import contextlib
 import logging
 
 from dsrag.database.chunk.db import ChunkDB
-from dsrag.database.chunk.types import FormattedDocument
+from dsrag.database.chunk.types import FormattedDocument, ChunkRow
 
 
 class SQLiteDB(ChunkDB):
@@ -105,33 +105,36 @@ class SQLiteDB(ChunkDB):
             created_on = str(int(time.time()))
             metadata_str = str(metadata)
 
+            columns = [
+                'doc_id', 'document_title', 'document_summary', 'section_title', 'section_summary',
+                'chunk_text', 'chunk_page_start', 'chunk_page_end', 'is_visual', 'chunk_index',
+                'chunk_length', 'created_on', 'supp_id', 'metadata'
+            ]
+            rows = []
             for chunk_index, chunk in chunks.items():
                 chunk_text = chunk.get("chunk_text", "")
-                chunk_length = len(chunk_text)
-
-                values_dict = {
-                    'doc_id': doc_id,
-                    'document_title': chunk.get("document_title", ""),
-                    'document_summary': chunk.get("document_summary", ""),
-                    'section_title': chunk.get("section_title", ""),
-                    'section_summary': chunk.get("section_summary", ""),
-                    'chunk_text': chunk_text,
-                    'chunk_page_start': chunk.get("chunk_page_start", None),
-                    'chunk_page_end': chunk.get("chunk_page_end", None),
-                    'is_visual': chunk.get("is_visual", False),
-                    'chunk_index': chunk_index,
-                    'chunk_length': chunk_length,
-                    'created_on': created_on,
-                    'supp_id': supp_id,
-                    'metadata': metadata_str
-                }
-
-                columns = ', '.join(values_dict.keys())
-                placeholders = ', '.join(['?'] * len(values_dict))
-                sql = f"INSERT INTO documents ({columns}) VALUES ({placeholders})"
-                
-                c.execute(sql, tuple(values_dict.values()))
-            
+                rows.append((
+                    doc_id,
+                    chunk.get("document_title", ""),
+                    chunk.get("document_summary", ""),
+                    chunk.get("section_title", ""),
+                    chunk.get("section_summary", ""),
+                    chunk_text,
+                    chunk.get("chunk_page_start", None),
+                    chunk.get("chunk_page_end", None),
+                    chunk.get("is_visual", False),
+                    chunk_index,
+                    len(chunk_text),
+                    created_on,
+                    supp_id,
+                    metadata_str
+                ))
+
+            # Insert all chunks in one statement and one transaction
+            placeholders = ', '.join(['?'] * len(columns))
+            sql = f"INSERT INTO documents ({', '.join(columns)}) VALUES ({placeholders})"
+            c.executemany(sql, rows)
+
             conn.commit()
 
         self._execute_with_retry(_add_doc, doc_id, chunks, supp_id, metadata)
@@ -168,12 +171,9 @@ class SQLiteDB(ChunkDB):
         # Turn the results into an object where the columns are keys
         full_document_string = ""
         if include_content:
-            # Concatenate the chunks into a single string
-            for result in results:
-                # Join each chunk text with a new line character
-                full_document_string += result[columns.index("chunk_text")] + "\n"
-            # Remove the last new line character
-            full_document_string = full_document_string[:-1]
+            # Join the chunk texts into a single string with new line characters
+            chunk_text_index = columns.index("chunk_text")
+            full_document_string = "\n".join(result[chunk_text_index] for result in results)
 
         supp_id = results[0][columns.index("supp_id")]
         title = results[0][columns.index("document_title")]
@@ -235,6 +235,40 @@ class SQLiteDB(ChunkDB):
             return result
         return None, None
 
+    def get_chunks_range(self, doc_id: str, chunk_start: int, chunk_end: int) -> list[ChunkRow]:
+        # Retrieve all the chunks in the range with one query
+        conn = sqlite3.connect(os.path.join(self.db_path, f"{self.kb_id}.db"))
+        c = conn.cursor()
+        c.execute(
+            "SELECT chunk_index, chunk_text, is_visual, chunk_page_start, chunk_page_end FROM documents "
+            "WHERE doc_id=? AND chunk_index>=? AND chunk_index<? ORDER BY chunk_index",
+            (doc_id, chunk_start, chunk_end)
+        )
+        results = c.fetchall()
+        conn.close()
+        return [
+            ChunkRow(
+                chunk_index=chunk_index,
+                chunk_text=chunk_text,
+                is_visual=is_visual,
+                chunk_page_start=chunk_page_start,
+                chunk_page_end=chunk_page_end,
+            )
+            for chunk_index, chunk_text, is_visual, chunk_page_start, chunk_page_end in results
+        ]
+
+    def segment_has_visual(self, doc_id: str, chunk_start: int, chunk_end: int) -> bool:
+        # Look for a single visual chunk in the range, rather than reading every chunk's flag
+        conn = sqlite3.connect(os.path.join(self.db_path, f"{self.kb_id}.db"))
+        c = conn.cursor()
+        c.execute(
+            "SELECT 1 FROM documents WHERE doc_id=? AND chunk_index>=? AND chunk_index<? AND is_visual LIMIT 1",
+            (doc_id, chunk_start, chunk_end)
+        )
+        result = c.fetchone()
+        conn.close()
+        return result is not None
+
     def get_document_title(self, doc_id: str, chunk_index: int) -> Optional[str]:
         # Retrieve the document title from the sqlite table
         conn = sqlite3.connect(os.path.join(self.db_path, f"{self.kb_id}.db"))
@@ -12,3 +12,11 @@ class FormattedDocument(TypedDict):
     supp_id: Optional[str] = None
     metadata: Optional[dict] = {}
     chunk_count: Optional[int] = 0
+
+
+class ChunkRow(TypedDict):
+    chunk_index: int
+    chunk_text: Optional[str]
+    is_visual: Optional[bool]
+    chunk_page_start: Optional[int]
+    chunk_page_end: Optional[int]
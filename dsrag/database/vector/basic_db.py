@@ -1,20 +1,104 @@
 import pickle
 from dsrag.database.vector.db import VectorDB
 from typing import Sequence, Optional
-from dsrag.database.vector.types import ChunkMetadata, Vector, VectorSearchResult
-from sklearn.metrics.pairwise import cosine_similarity
+from dsrag.database.vector.types import ChunkMetadata, MetadataFilter, Vector, VectorSearchResult
 import os
 import numpy as np
 from dsrag.utils.imports import faiss
 
 
+# Quantized vectors are upcast to float32 this many rows at a time, so a search never holds a full
+# float32 copy of a quantized store in memory
+QUANTIZED_BLOCK_SIZE = 4096
+
+
+def row_norms(vectors_array: np.ndarray) -> np.ndarray:
+    """L2 norm of each row, as float32. Quantized rows are upcast a block at a time."""
+    if vectors_array.dtype == np.float32:
+        return np.sqrt(np.einsum("ij,ij->i", vectors_array, vectors_array))
+    norms = np.empty(len(vectors_array), dtype=np.float32)
+    for start in range(0, len(vectors_array), QUANTIZED_BLOCK_SIZE):
+        block = vectors_array[start:start + QUANTIZED_BLOCK_SIZE].astype(np.float32)
+        norms[start:start + QUANTIZED_BLOCK_SIZE] = np.sqrt(np.einsum("ij,ij->i", block, block))
+    return norms
+
+
+def cosine_similarities(query_vector, vectors_array: np.ndarray, vector_norms: Optional[np.ndarray] = None) -> np.ndarray:
+    """Cosine similarity between one query vector and each row of an array, as a float32 array.
+
+    The array can be float32, or float16/int8 quantized - cosine similarity doesn't depend on each
+    vector's scale, so int8 rows don't need their scales here. Pass the row norms if they're already
+    known. Zero vectors get a similarity of 0.
+    """
+    query = np.ascontiguousarray(query_vector, dtype=np.float32).ravel()
+    if vector_norms is None:
+        vector_norms = row_norms(vectors_array)
+    if vectors_array.dtype == np.float32:
+        dot_products = vectors_array @ query
+    else:
+        dot_products = np.empty(len(vectors_array), dtype=np.float32)
+        for start in range(0, len(vectors_array), QUANTIZED_BLOCK_SIZE):
+            dot_products[start:start + QUANTIZED_BLOCK_SIZE] = (
+                vectors_array[start:start + QUANTIZED_BLOCK_SIZE].astype(np.float32) @ query
+            )
+    return dot_products / np.maximum(vector_norms * np.sqrt(np.vdot(query, query)), 1e-12)
+
+
+def matches_metadata_filter(metadata: ChunkMetadata, metadata_filter: MetadataFilter) -> bool:
+    """Whether a chunk's metadata passes a metadata filter. Chunks without the field never match."""
+    field = metadata_filter["field"]
+    if field not in metadata:
+        return False
+    value = metadata[field]
+    filter_value = metadata_filter["value"]
+    operator = metadata_filter["operator"]
+    if operator == "equals":
+        return value == filter_value
+    elif operator == "not_equals":
+        return value != filter_value
+    elif operator == "in":
+        return value in filter_value
+    elif operator == "not_in":
+        return value not in filter_value
+    elif operator == "greater_than":
+        return value > filter_value
+    elif operator == "less_than":
+        return value < filter_value
+    elif operator == "greater_than_equals":
+        return value >= filter_value
+    elif operator == "less_than_equals":
+        return value <= filter_value
+    raise ValueError(f"Unsupported metadata filter operator: {operator}")
+
+
+def top_k_indices(similarities: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the top_k highest similarities, highest first (ties in index order).
+
+    Uses a partial sort, so only the top_k candidates get fully sorted.
+    """
+    if top_k < len(similarities):
+        candidates = np.argpartition(-similarities, top_k - 1)[:top_k]
+    else:
+        candidates = np.arange(len(similarities))
+    return candidates[np.lexsort((candidates, -similarities[candidates]))]
+
+
 class BasicVectorDB(VectorDB):
     def __init__(
-        self, kb_id: str, storage_directory: str = "~/dsRAG", use_faiss: bool = False
+        self, kb_id: str, storage_directory: str = "~/dsRAG", use_faiss: bool = False, quantization: Optional[str] = None
     ) -> None:
+        """
+        Args:
+            quantization: how to store the vectors - None keeps them as given (float32 from KnowledgeBase),
+                "float16" halves the size, and "int8" quarters it by scaling each vector by its largest
+                absolute value. Search results are approximate for the quantized options.
+        """
+        if quantization not in (None, "float16", "int8"):
+            raise ValueError(f"Unsupported quantization: {quantization}. Use None, 'float16' or 'int8'.")
         self.kb_id = kb_id
         self.storage_directory = storage_directory
         self.use_faiss = use_faiss
+        self.quantization = quantization
         self.vector_storage_path = os.path.join(
             self.storage_directory, "vector_storage", f"{kb_id}.pkl"
         )
@@ -29,50 +113,104 @@ class BasicVectorDB(VectorDB):
             raise ValueError(
                 "Error in add_vectors: the number of vectors and metadata items must be the same."
             )
-        self.vectors.extend(vectors)
+        self._add_quantized(vectors)
         self.metadata.extend(metadata)
+        self._search_arrays = None
         self.save()
 
-    def search(self, query_vector, top_k=10, metadata_filter: Optional[dict] = None) -> list[VectorSearchResult]:
+    def _add_quantized(self, vectors: Sequence[Vector]) -> None:
+        if self.quantization == "int8":
+            for vector in vectors:
+                vector = np.asarray(vector, dtype=np.float32)
+                scale = float(np.abs(vector).max()) / 127 or 1.0
+                self.vectors.append(np.clip(np.round(vector / scale), -128, 127).astype(np.int8))
+                self.vector_scales.append(scale)
+        elif self.quantization == "float16":
+            self.vectors.extend(np.asarray(vector, dtype=np.float16) for vector in vectors)
+        else:
+            self.vectors.extend(vectors)
+
+    def _vectors_array(self) -> np.ndarray:
+        """All stored vectors as one float32 array, dequantized if needed."""
+        vectors_array = np.array(self.vectors, dtype=np.float32).reshape(len(self.vectors), -1)
+        if self.quantization == "int8":
+            vectors_array *= np.array(self.vector_scales, dtype=np.float32)[:, None]
+        return vectors_array
+
+    def _get_search_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """The stored vectors as one array in their stored dtype, and its row norms.
+
+        Both are kept between searches until the vectors change, so scoring a query is one
+        matrix-vector product. The stored vectors become rows of the array, so it doesn't double
+        the memory used, and quantized vectors stay quantized.
+        """
+        search_arrays = self._search_arrays
+        if search_arrays is None:
+            dtype = {"int8": np.int8, "float16": np.float16}.get(self.quantization, np.float32)
+            vectors_array = np.array(self.vectors, dtype=dtype).reshape(len(self.vectors), -1)
+            search_arrays = (vectors_array, row_norms(vectors_array))
+            self.vectors = list(vectors_array)
+            self._search_arrays = search_arrays
+        return search_arrays
+
+    def search(self, query_vector, top_k=10, metadata_filter: Optional[MetadataFilter] = None) -> list[VectorSearchResult]:
         if not self.vectors:
             return []
 
+        # the metadata filter is applied before ranking, so only matching vectors are scored
+        candidate_indices = self._filter_indices(metadata_filter)
+        if candidate_indices is not None and len(candidate_indices) == 0:
+            return []
+
         if self.use_faiss:
             try:
-                return self.search_faiss(query_vector, top_k)
+                return self.search_faiss(query_vector, top_k, candidate_indices)
             except Exception as e:
                 print(f"Faiss search failed: {e}. Falling back to numpy search.")
-                return self._fallback_search(query_vector, top_k)
+                return self._fallback_search(query_vector, top_k, candidate_indices)
         else:
-            return self._fallback_search(query_vector, top_k)
+            return self._fallback_search(query_vector, top_k, candidate_indices)
 
-    def _fallback_search(self, query_vector, top_k=10) -> list[VectorSearchResult]:
-        """Fallback search method using numpy when faiss is not available."""
-        similarities = cosine_similarity([query_vector], self.vectors)[0]
-        indexed_similarities = sorted(
-            enumerate(similarities), key=lambda x: x[1], reverse=True
+    def _filter_indices(self, metadata_filter: Optional[MetadataFilter]) -> Optional[np.ndarray]:
+        """Indices of the vectors whose metadata passes the filter, or None if there's no filter."""
+        if not metadata_filter:
+            return None
+        return np.array(
+            [i for i, metadata in enumerate(self.metadata) if matches_metadata_filter(metadata, metadata_filter)],
+            dtype=np.int64,
         )
+
+    def _fallback_search(self, query_vector, top_k=10, candidate_indices: Optional[np.ndarray] = None) -> list[VectorSearchResult]:
+        """Fallback search method using numpy when faiss is not available."""
+        vectors_array, vector_norms = self._get_search_arrays()
+        if candidate_indices is not None:
+            vectors_array, vector_norms = vectors_array[candidate_indices], vector_norms[candidate_indices]
+        similarities = cosine_similarities(query_vector, vectors_array, vector_norms)
         results: list[VectorSearchResult] = []
-        for i, similarity in indexed_similarities[:top_k]:
+        for i in top_k_indices(similarities, top_k):
             result = VectorSearchResult(
                 doc_id=None,
                 vector=None,
-                metadata=self.metadata[i],
-                similarity=similarity,
+                metadata=self.metadata[i if candidate_indices is None else candidate_indices[i]],
+                similarity=float(similarities[i]),
             )
             results.append(result)
         return results
 
-    def search_faiss(self, query_vector, top_k=10) -> list[VectorSearchResult]:
-        # Limit top_k to the number of vectors we have - Faiss doesn't automatically handle this
-        top_k = min(top_k, len(self.vectors))
-
+    def search_faiss(self, query_vector, top_k=10, candidate_indices: Optional[np.ndarray] = None) -> list[VectorSearchResult]:
         # faiss expects 2D arrays of vectors
-        vectors_array = (
-            np.array(self.vectors).astype("float32").reshape(len(self.vectors), -1)
-        )
+        if self.quantization is None:
+            vectors_array, vector_norms = self._get_search_arrays()
+        else:
+            vectors_array = self._vectors_array()
+            vector_norms = row_norms(vectors_array)
+        if candidate_indices is not None:
+            vectors_array, vector_norms = vectors_array[candidate_indices], vector_norms[candidate_indices]
         query_vector_array = np.array(query_vector).astype("float32").reshape(1, -1)
 
+        # Limit top_k to the number of vectors we have - Faiss doesn't automatically handle this
+        top_k = min(top_k, len(vectors_array))
+
         try:
             # Access nested modules step by step
             contrib = faiss.contrib
@@ -93,13 +231,14 @@ class BasicVectorDB(VectorDB):
                 )
                 
         # I is a list of indices in the corpus_vectors array
+        similarities = cosine_similarities(query_vector_array, vectors_array[I[0]], vector_norms[I[0]])
         results: list[VectorSearchResult] = []
-        for i in I[0]:
+        for i, similarity in zip(I[0], similarities):
             result = VectorSearchResult(
                 doc_id=None,
                 vector=None,
-                metadata=self.metadata[i],
-                similarity=cosine_similarity([query_vector], [self.vectors[i]])[0][0],
+                metadata=self.metadata[i if candidate_indices is None else candidate_indices[i]],
+                similarity=float(similarity),
             )
             results.append(result)
         return results
@@ -110,8 +249,11 @@ class BasicVectorDB(VectorDB):
             if self.metadata[i]["doc_id"] == doc_id:
                 del self.vectors[i]
                 del self.metadata[i]
+                if self.quantization == "int8":
+                    del self.vector_scales[i]
             else:
                 i += 1
+        self._search_arrays = None
         self.save()
 
     def save(self):
@@ -119,12 +261,28 @@ class BasicVectorDB(VectorDB):
             os.path.dirname(self.vector_storage_path), exist_ok=True
         )  # Ensure the directory exists
         with open(self.vector_storage_path, "wb") as f:
-            pickle.dump((self.vectors, self.metadata), f)
+            if self.quantization == "int8":
+                # int8 vectors are only meaningful together with their scales
+                pickle.dump((self.vectors, self.metadata, self.vector_scales), f, protocol=pickle.HIGHEST_PROTOCOL)
+            else:
+                pickle.dump((self.vectors, self.metadata), f, protocol=pickle.HIGHEST_PROTOCOL)
 
     def load(self):
+        self._search_arrays = None
+        self.vector_scales = []
         if os.path.exists(self.vector_storage_path):
             with open(self.vector_storage_path, "rb") as f:
-                self.vectors, self.metadata = pickle.load(f)
+                data = pickle.load(f)
+            vectors, self.metadata = data[0], data[1]
+            stored_scales = data[2] if len(data) > 2 else None
+            if (stored_scales is not None) == (self.quantization == "int8"):
+                self.vectors, self.vector_scales = vectors, stored_scales or []
+            else:
+                # stored with a different quantization setting, so convert to the current one
+                if stored_scales is not None:
+                    vectors = [vector.astype(np.float32) * scale for vector, scale in zip(vectors, stored_scales)]
+                self.vectors = []
+                self._add_quantized(vectors)
         else:
             self.vectors = []
             self.metadata = []
@@ -139,4 +297,5 @@ class BasicVectorDB(VectorDB):
             "kb_id": self.kb_id,
             "storage_directory": self.storage_directory,
             "use_faiss": self.use_faiss,
+            "quantization": self.quantization,
         }
@@ -1,4 +1,5 @@
 import os
+import numpy as np
 from typing import Optional, Sequence
 
 from dsrag.database.vector import VectorSearchResult
@@ -113,7 +114,7 @@ class MilvusDB(VectorDB):
         for i, vector in enumerate(vectors):
             data.append({
                 'doc_id': ids[i],
-                'vector': vector,
+                'vector': vector.tolist() if isinstance(vector, np.ndarray) else vector,
                 'metadata': metadata[i]
             })
 
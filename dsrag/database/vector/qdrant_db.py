@@ -126,7 +126,7 @@ class QdrantVectorDB(VectorDB):
             points.append(
                 qdrant_client.models.PointStruct(
                     id=uuid,
-                    vector=vector,
+                    vector=vector.tolist() if isinstance(vector, np.ndarray) else vector,
                     payload={
                         "content": chunk_text,
                         "doc_id": doc_id,
@@ -136,7 +136,10 @@ class QdrantVectorDB(VectorDB):
                 )
             )
 
-        self.client.upsert(self.kb_id, points)
+        # Batch the points into groups of 256 to stay well under Qdrant's request size limit
+        batch_size = 256
+        for i in range(0, len(points), batch_size):
+            self.client.upsert(self.kb_id, points[i:i+batch_size])
 
     def remove_document(self, doc_id) -> None:
         """
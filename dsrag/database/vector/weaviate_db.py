@@ -140,7 +140,7 @@ class WeaviateVectorDB(VectorDB):
                         "chunk_index": chunk_index,
                         "metadata": meta,
                     },
-                    vector=vector,
+                    vector=vector.tolist() if isinstance(vector, np.ndarray) else vector,
                     uuid=uuid,
                 )
 
@@ -6,6 +6,10 @@ from abc import ABC, abstractmethod
 from typing import List, Optional
 from datetime import datetime
 
+# Written after the page content of every page of a document has been saved, so a conversion that
+# was interrupted part way through isn't mistaken for a finished one
+PAGE_CONTENT_COMPLETE = "page_content_complete"
+
 
 class FileSystem(ABC):
     subclasses = {}
@@ -81,6 +85,14 @@ class FileSystem(ABC):
         """Load the text content for a range of pages"""
         pass
 
+    def mark_page_content_complete(self, kb_id: str, doc_id: str, num_pages: int) -> None:
+        """Record that the page content of every page of a document has been saved"""
+        self.save_json(kb_id, doc_id, f"{PAGE_CONTENT_COMPLETE}.json", {"num_pages": num_pages})
+
+    def page_content_exists(self, kb_id: str, doc_id: str) -> bool:
+        """Check whether page content has already been saved for every page of a document"""
+        return self.load_data(kb_id, doc_id, PAGE_CONTENT_COMPLETE) is not None
+
     @abstractmethod
     def load_data(self, kb_id: str, doc_id: str, data_name: str) -> Optional[dict]:
         """Load JSON data from a file
@@ -206,6 +218,10 @@ class LocalFileSystem(FileSystem):
         except FileNotFoundError:
             return None
 
+    def page_content_exists(self, kb_id: str, doc_id: str) -> bool:
+        """Check whether page content has already been saved for every page of a document"""
+        return os.path.exists(os.path.join(self.base_path, kb_id, doc_id, f'{PAGE_CONTENT_COMPLETE}.json'))
+
     def load_page_content_range(self, kb_id: str, doc_id: str, page_start: int, page_end: int) -> list[str]:
         """Load the text content for a range of pages"""
         page_contents = []
@@ -501,6 +517,15 @@ class S3FileSystem(FileSystem):
             print(f"Error loading page content from S3: {e}")
             return None
 
+    def page_content_exists(self, kb_id: str, doc_id: str) -> bool:
+        """Check whether page content has already been saved for every page of a document"""
+        s3_client = self.create_s3_client()
+        try:
+            s3_client.head_object(Bucket=self.bucket_name, Key=f"{kb_id}/{doc_id}/{PAGE_CONTENT_COMPLETE}.json")
+            return True
+        except Exception:
+            return False
+
     def load_page_content_range(self, kb_id: str, doc_id: str, page_start: int, page_end: int) -> list[str]:
         """Load the text content for a range of pages from S3"""
         page_contents = []
@@ -146,9 +146,8 @@ def parse_page(kb_id: str, doc_id: str, file_system: FileSystem, page_number: in
     - page_content: list of Elements
     """
 
-    # use default vlm_provider and model if not provided
-    if "provider" not in vlm_config:
-        vlm_config["provider"] = "gemini"
+    # use default vlm_provider and model if not provided (on a copy, so the caller's config isn't modified)
+    vlm_config = {"provider": "gemini", **vlm_config}
     if "model" not in vlm_config:
         if vlm_config["provider"] == "gemini":
             vlm_config["model"] = "gemini-2.0-flash"
@@ -7,7 +7,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from .file_parsing.vlm_file_parsing import parse_file, pdf_to_images
 from .file_parsing.non_vlm_file_parsing import parse_file_no_vlm
 from .file_parsing.element_types import default_element_types
-from .sectioning_and_chunking.semantic_sectioning import get_sections_from_elements, get_sections_from_str, get_sections_from_pages
+from .sectioning_and_chunking.semantic_sectioning import get_sections_from_elements, get_sections_from_str, get_sections_from_pages, str_to_lines, no_semantic_sectioning
 from .sectioning_and_chunking.chunking import chunk_document
 from .models.types import FileParsingConfig, VLMConfig, SemanticSectioningConfig, ChunkingConfig, Section, Chunk
 from .file_parsing.file_system import FileSystem, LocalFileSystem
@@ -335,6 +335,22 @@ def parse_and_chunk_no_vlm(semantic_sectioning_config: SemanticSectioningConfig,
     if always_save_page_images and file_system is None:
         raise ValueError("If always_save_page_images is True, a file_system must be provided")
 
+    if text and not file_path and not testing_mode and not semantic_sectioning_config.get("use_semantic_sectioning", True):
+        # Plain text without semantic sectioning: nothing to parse and no LLM calls, the whole text is one section
+        document_lines = str_to_lines(text)
+        sections = no_semantic_sectioning(document_content=text, num_lines=len(document_lines))
+        chunks = chunk_document(
+            sections=sections,
+            document_lines=document_lines,
+            chunk_size=chunking_config.get('chunk_size', 800),
+            min_length_for_chunking=chunking_config.get('min_length_for_chunking', 1600)
+        )
+        logger.debug("Chunked plain text without semantic sectioning", extra={
+            **base_extra,
+            "num_chunks": len(chunks)
+        })
+        return sections, chunks
+
     # Step 1: Parse the file
     logger.debug("Starting non-VLM file parsing", extra=base_extra)
     
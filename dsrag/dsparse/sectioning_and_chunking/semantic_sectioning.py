@@ -1,5 +1,6 @@
 import os
 import time
+import asyncio
 import logging
 from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel, Field
@@ -61,12 +62,50 @@ def get_document_text_for_window(document_lines: List[Line], window_start_line:
 
     return document_with_line_numbers
 
+def get_instructor_client(llm_provider: str, model: str) -> Any:
+    """
+    Creates an instructor-patched client for the given LLM provider. The client can be
+    created once and passed to get_structured_document_for_window (or any of the
+    get_sections_* functions) so that connections are reused across windows.
+
+    Args:
+        llm_provider: The LLM provider (e.g., "openai", "anthropic", "gemini").
+        model: The specific LLM model name (only used by Gemini, where the client is model-specific).
+
+    Returns:
+        An instructor client for the provider.
+    """
+    if llm_provider == "anthropic":
+        from anthropic import Anthropic
+        base_url = os.environ.get("DSRAG_ANTHROPIC_BASE_URL", None)
+        if base_url is not None:
+            return instructor.from_anthropic(Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"], base_url=base_url))
+        else:
+            return instructor.from_anthropic(Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"]))
+    elif llm_provider == "openai":
+        from openai import OpenAI
+        base_url = os.environ.get("DSRAG_OPENAI_BASE_URL", None)
+        if base_url is not None:
+            return instructor.from_openai(OpenAI(api_key=os.environ["OPENAI_API_KEY"], base_url=base_url))
+        else:
+            return instructor.from_openai(OpenAI(api_key=os.environ["OPENAI_API_KEY"]))
+    elif llm_provider == "gemini":
+        import google.generativeai as genai
+        genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+        return instructor.from_gemini(
+            client=genai.GenerativeModel(model_name=f"models/{model}"),
+            mode=instructor.Mode.GEMINI_JSON
+        )
+    else:
+        raise ValueError("Invalid provider. Must be one of: 'anthropic', 'openai', 'gemini'.")
+
 def get_structured_document_for_window(
     window_text_with_lines: str,
     first_line_number_in_window_prompt: int,
     llm_provider: str,
     model: str,
-    language: str
+    language: str,
+    client: Optional[Any] = None
 ) -> StructuredDocument:
     """
     Sends a single window's text (with global line numbers in brackets) to the LLM
@@ -81,6 +120,8 @@ def get_structured_document_for_window(
         llm_provider: The LLM provider (e.g., "openai", "anthropic").
         model: The specific LLM model name.
         language: The language of the document.
+        client: An optional instructor client (see get_instructor_client) to reuse. If not
+                provided, a new client is created for this call.
 
     Returns:
         A StructuredDocument object containing sections identified by the LLM for this window.
@@ -89,13 +130,10 @@ def get_structured_document_for_window(
     if language != "en":
         formatted_system_prompt += "\n" + LANGUAGE_ADDENDUM
 
+    if client is None:
+        client = get_instructor_client(llm_provider, model)
+
     if llm_provider == "anthropic":
-        from anthropic import Anthropic
-        base_url = os.environ.get("DSRAG_ANTHROPIC_BASE_URL", None)
-        if base_url is not None:
-            client = instructor.from_anthropic(Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"], base_url=base_url))
-        else:
-            client = instructor.from_anthropic(Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"]))
         return client.chat.completions.create(
             model=model,
             response_model=StructuredDocument,
@@ -110,12 +148,6 @@ def get_structured_document_for_window(
             ],
         )
     elif llm_provider == "openai":
-        from openai import OpenAI
-        base_url = os.environ.get("DSRAG_OPENAI_BASE_URL", None)
-        if base_url is not None:
-            client = instructor.from_openai(OpenAI(api_key=os.environ["OPENAI_API_KEY"], base_url=base_url))
-        else:
-            client = instructor.from_openai(OpenAI(api_key=os.environ["OPENAI_API_KEY"]))
         return client.chat.completions.create(
             model=model,
             response_model=StructuredDocument,
@@ -133,12 +165,6 @@ def get_structured_document_for_window(
             ],
         )
     elif llm_provider == "gemini":
-        import google.generativeai as genai
-        genai.configure(api_key=os.environ["GEMINI_API_KEY"])
-        client = instructor.from_gemini(
-            client=genai.GenerativeModel(model_name=f"models/{model}"),
-            mode=instructor.Mode.GEMINI_JSON
-        )
         # For Gemini, prepend the system prompt to the user message
         combined_prompt = f"{formatted_system_prompt}\n\n<document>\n{window_text_with_lines}\n</document>"
         return client.messages.create(
@@ -522,7 +548,8 @@ def process_window_with_retries(
     initial_delay: float = 5.0,
     backoff_factor: float = 2.0,
     kb_id: str = "",
-    doc_id: str = ""
+    doc_id: str = "",
+    client: Optional[Any] = None
 ) -> Optional[StructuredDocument]:
     """
     Processes a single document window by calling the LLM, including retry logic
@@ -541,6 +568,7 @@ def process_window_with_retries(
         backoff_factor: Factor by which the delay increases for subsequent retries.
         kb_id: Knowledge base identifier (for logging).
         doc_id: Document identifier (for logging).
+        client: An optional instructor client to reuse for the LLM call.
 
     Returns:
         A StructuredDocument object if successful, or None if all retries fail.
@@ -570,7 +598,8 @@ def process_window_with_retries(
                 first_line_number_in_window_prompt,
                 llm_provider,
                 model,
-                language
+                language,
+                client=client
             )
 
             # If successful, return the result
@@ -786,7 +815,8 @@ def get_sections(
     kb_id: str = "",
     doc_id: str = "",
     llm_max_concurrent_requests: int = 5,
-    min_avg_chars_per_section: int = 500
+    min_avg_chars_per_section: int = 500,
+    client: Optional[Any] = None
 ) -> List[Section]:
     """
     Orchestrates the parallel semantic sectioning of a document.
@@ -809,6 +839,8 @@ def get_sections(
         min_avg_chars_per_section: Minimum average characters per section within a window.
             If a window has multiple sections with average length below this threshold,
             they will be consolidated into a single section. Default is 500.
+        client: An optional instructor client shared by all windows. If not provided, one is
+            created here and shared by all windows.
 
     Returns:
         A list of Section objects for the entire document.
@@ -837,6 +869,14 @@ def get_sections(
         logger.warning("No document windows created, document might be empty", extra=base_extra)
         return []
 
+    # Create one client for all the windows, rather than one per LLM call
+    if client is None:
+        try:
+            client = get_instructor_client(llm_provider, model)
+        except Exception as e:
+            # leave it to each window's retries, which log a failed LLM call the same way
+            logger.warning(f"Failed to create LLM client, each window will try again: {e}", extra=base_extra)
+
     # Step 2: Process each window in parallel
     window_sections = []
 
@@ -858,7 +898,8 @@ def get_sections(
                 model,
                 language,
                 kb_id=kb_id,
-                doc_id=doc_id
+                doc_id=doc_id,
+                client=client
             )
             window_futures.append((window_idx, window_start, window_end, future))
 
@@ -948,7 +989,8 @@ def get_sections_from_elements(
     semantic_sectioning_config: Dict[str, Any] = None,
     chunking_config: Dict[str, Any] = None,
     kb_id: str = "",
-    doc_id: str = ""
+    doc_id: str = "",
+    client: Optional[Any] = None
 ) -> Tuple[List[Section], List[Line]]:
     """
     Generates sections from a list of document elements using parallel processing.
@@ -963,6 +1005,7 @@ def get_sections_from_elements(
         chunking_config: Configuration for document chunking.
         kb_id: Knowledge base identifier (for logging).
         doc_id: Document identifier (for logging).
+        client: An optional instructor client to reuse across all LLM calls.
 
     Returns:
         A tuple of (sections, document_lines).
@@ -999,7 +1042,8 @@ def get_sections_from_elements(
             kb_id=kb_id,
             doc_id=doc_id,
             llm_max_concurrent_requests=llm_max_concurrent_requests,
-            min_avg_chars_per_section=min_avg_chars_per_section
+            min_avg_chars_per_section=min_avg_chars_per_section,
+            client=client
         )
     else:
         # Fallback to no semantic sectioning
@@ -1013,7 +1057,8 @@ def get_sections_from_str(
     semantic_sectioning_config: Dict[str, Any] = None,
     chunking_config: Dict[str, Any] = None,
     kb_id: str = "",
-    doc_id: str = ""
+    doc_id: str = "",
+    client: Optional[Any] = None
 ) -> Tuple[List[Section], List[Line]]:
     """
     Generates sections from a document string using parallel processing.
@@ -1026,6 +1071,7 @@ def get_sections_from_str(
         chunking_config: Configuration for document chunking.
         kb_id: Knowledge base identifier (for logging).
         doc_id: Document identifier (for logging).
+        client: An optional instructor client to reuse across all LLM calls.
 
     Returns:
         A tuple of (sections, document_lines).
@@ -1058,7 +1104,8 @@ def get_sections_from_str(
             kb_id=kb_id,
             doc_id=doc_id,
             llm_max_concurrent_requests=llm_max_concurrent_requests,
-            min_avg_chars_per_section=min_avg_chars_per_section
+            min_avg_chars_per_section=min_avg_chars_per_section,
+            client=client
         )
     else:
         # Fallback to no semantic sectioning
@@ -1066,13 +1113,50 @@ def get_sections_from_str(
 
     return sections, document_lines
 
+async def get_sections_from_str_async(
+    document: str,
+    max_characters_per_window: int = 20000,
+    semantic_sectioning_config: Dict[str, Any] = None,
+    chunking_config: Dict[str, Any] = None,
+    kb_id: str = "",
+    doc_id: str = "",
+    client: Optional[Any] = None
+) -> Tuple[List[Section], List[Line]]:
+    """
+    Async version of get_sections_from_str. The existing pipeline runs in a worker thread,
+    so several documents (or providers) can be sectioned concurrently with asyncio.gather.
+
+    Args:
+        document: Document content as a string.
+        max_characters_per_window: Maximum characters per processing window.
+        semantic_sectioning_config: Configuration for semantic sectioning.
+        chunking_config: Configuration for document chunking.
+        kb_id: Knowledge base identifier (for logging).
+        doc_id: Document identifier (for logging).
+        client: An optional instructor client to reuse across all LLM calls.
+
+    Returns:
+        A tuple of (sections, document_lines).
+    """
+    return await asyncio.to_thread(
+        get_sections_from_str,
+        document=document,
+        max_characters_per_window=max_characters_per_window,
+        semantic_sectioning_config=semantic_sectioning_config,
+        chunking_config=chunking_config,
+        kb_id=kb_id,
+        doc_id=doc_id,
+        client=client
+    )
+
 def get_sections_from_pages(
     pages: List[str],
     max_characters_per_window: int = 20000,
     semantic_sectioning_config: Dict[str, Any] = None,
     chunking_config: Dict[str, Any] = None,
     kb_id: str = "",
-    doc_id: str = ""
+    doc_id: str = "",
+    client: Optional[Any] = None
 ) -> Tuple[List[Section], List[Line]]:
     """
     Generates sections from a list of page strings using parallel processing.
@@ -1085,6 +1169,7 @@ def get_sections_from_pages(
         chunking_config: Configuration for document chunking.
         kb_id: Knowledge base identifier (for logging).
         doc_id: Document identifier (for logging).
+        client: An optional instructor client to reuse across all LLM calls.
 
     Returns:
         A tuple of (sections, document_lines).
@@ -1119,7 +1204,8 @@ def get_sections_from_pages(
             kb_id=kb_id,
             doc_id=doc_id,
             llm_max_concurrent_requests=llm_max_concurrent_requests,
-            min_avg_chars_per_section=min_avg_chars_per_section
+            min_avg_chars_per_section=min_avg_chars_per_section,
+            client=client
         )
     else:
         # Fallback to no semantic sectioning
@@ -1,15 +1,68 @@
+"""
+Semantic sectioning tests. By default every LLM call is replaced with recorded responses from
+tests/data, so the suite runs offline in well under a second.
+
+Slower tiers are opt-in through environment variables:
+- DSRAG_LIVE_LLM=1: also run sectioning against the live OpenAI, Anthropic and Gemini APIs
+  (requires OPENAI_API_KEY, ANTHROPIC_API_KEY and GEMINI_API_KEY)
+- DSRAG_STRESS=1: also run the stress tests on much larger documents
+"""
 import os
 import sys
+import json
+import time
+import hashlib
+import asyncio
+import threading
 import unittest
+from operator import itemgetter
 from unittest.mock import patch, Mock
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from dsparse.sectioning_and_chunking.semantic_sectioning import get_sections_from_str, DocumentSection
+from dsparse.sectioning_and_chunking.semantic_sectioning import (
+    get_sections_from_str,
+    get_sections_from_str_async,
+    get_instructor_client,
+    str_to_lines,
+    create_document_windows,
+    DocumentSection,
+    StructuredDocument,
+)
 from dsparse.main import parse_and_chunk
 
-class TestSemanticSectioning(unittest.TestCase):
+PROVIDERS = [
+    ("openai", "gpt-4.1-mini"),
+    ("anthropic", "claude-3-5-haiku-latest"),
+    ("gemini", "gemini-2.0-flash"),
+]
+
+_get_section_fields = itemgetter('title', 'content', 'start', 'end')
+
+class _WindowCache:
+    """Exact-match cache of window responses, keyed on a hash of the window text (which includes global line numbers)"""
+
+    def __init__(self):
+        self._responses = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, window_text, compute):
+        key = hashlib.blake2b(window_text.encode(), digest_size=16).hexdigest()
+        with self._lock:
+            if key in self._responses:
+                self.hits += 1
+                return self._responses[key]
+            self.misses += 1
+        response = compute()
+        with self._lock:
+            self._responses[key] = response
+        return response
+
+class TestSemanticSectioning(unittest.IsolatedAsyncioTestCase):
+    _doc_cache = {}
     
     @classmethod
     def setUpClass(self):
@@ -46,14 +99,79 @@ Standardization of AI validation protocols and implementation guidelines emerges
 The potential for AI to improve healthcare delivery remains high, but careful consideration must be given to practical implementation challenges."""
 
         # Longer document to test parallelization
-        self.longer_document = self.test_document * 3
+        self.longer_document = self._make_doc(3)
         self.test_document_short = "This is a short document."
 
+        # 50 sections for the ~100-line safeguard document = way too many
+        self._EXCESSIVE_SECTIONS = tuple(
+            DocumentSection(title=f"Tiny Section {i}", start_index=i) for i in range(50)
+        )
+
+        # Split the longer document into lines and windows once, for the window sizes used below
+        _, self._windows_5000 = self._precompute_windows(self.longer_document, 5000)
+        _, self._windows_3000 = self._precompute_windows(self.longer_document, 3000)
+
+        # Recorded LLM responses for each provider, keyed on global line numbers of longer_document
+        data_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../data'))
+        self._mocked_sections = {}
+        for provider, _ in PROVIDERS:
+            with open(os.path.join(data_path, f"semantic_sectioning_{provider}.json"), "r") as f:
+                self._mocked_sections[provider] = [DocumentSection(**section) for section in json.load(f)]
+
+        # One client per provider, shared by every window of every live test
+        self._live_clients = {}
+        if os.getenv("DSRAG_LIVE_LLM") == "1":
+            for provider, model in PROVIDERS:
+                self._live_clients[provider] = get_instructor_client(provider, model)
+
+    def setUp(self):
+        # (concurrency, number of sections, elapsed seconds) per run of test_concurrency_levels
+        self._metrics = []
+
+    @classmethod
+    def _make_doc(cls, n):
+        """Returns test_document repeated n times, built once per n"""
+        if n not in cls._doc_cache:
+            cls._doc_cache[n] = cls.test_document * n
+        return cls._doc_cache[n]
+
+    @classmethod
+    def _precompute_windows(cls, text, max_characters_per_window):
+        """Returns the document lines and the (start_line, end_line) windows that get_sections will use"""
+        document_lines = str_to_lines(text)
+        return document_lines, create_document_windows(document_lines, max_characters_per_window)
+
+    def _mock_window_response(self, provider, windows):
+        """Returns a side effect for process_window_with_retries that replays the recorded sections for a window"""
+        window_ends = dict(windows)
+        def side_effect(window_text_with_lines, first_line_number_in_window_prompt, *args, **kwargs):
+            last_line_number_in_window = window_ends[first_line_number_in_window_prompt]
+            return StructuredDocument(sections=[
+                section for section in self._mocked_sections[provider]
+                if first_line_number_in_window_prompt <= section.start_index <= last_line_number_in_window
+            ])
+        return side_effect
+
     def _validate_sections(self, sections, document_lines):
         """Helper method to validate section structure"""
         self.assertTrue(len(sections) > 0)
         self.assertEqual(type(sections), list)
-        
+
+        # Fast path: check every section in a single pass
+        num_lines = len(document_lines)
+        try:
+            if all(
+                title and content and isinstance(start, int) and isinstance(end, int) and 0 <= start < end < num_lines
+                for title, content, start, end in map(_get_section_fields, sections)
+            ):
+                return
+        except KeyError:
+            pass
+
+        # Slow path: something is wrong, so re-run the per-key checks to get a useful failure message
+        self._validate_sections_detailed(sections, document_lines)
+
+    def _validate_sections_detailed(self, sections, document_lines):
         # Validate section types
         for section in sections:
             # Validate section has required keys
@@ -73,11 +191,11 @@ The potential for AI to improve healthcare delivery remains high, but careful co
             self.assertLess(section['end'], len(document_lines))
             self.assertLess(section['start'], section['end'])
 
-    def test_openai_semantic_sectioning(self):
+    def _provider_sectioning_kwargs(self, provider, model, client=None):
         semantic_sectioning_config = {
             "use_semantic_sectioning": True,
-            "llm_provider": "openai",
-            "model": "gpt-4.1-mini",
+            "llm_provider": provider,
+            "model": model,
             "language": "en",
             "llm_max_concurrent_requests": 3  # For parallel processing
         }
@@ -86,58 +204,50 @@ The potential for AI to improve healthcare delivery remains high, but careful co
             "min_length_for_chunking": 1000
         }
         
-        sections, document_lines = get_sections_from_str(
+        return dict(
             document=self.longer_document,
             max_characters_per_window=5000,  # Smaller windows to test parallelization
             semantic_sectioning_config=semantic_sectioning_config,
-            chunking_config=chunking_config
+            chunking_config=chunking_config,
+            client=client
         )
-        
-        self._validate_sections(sections, document_lines)
 
-    def test_anthropic_semantic_sectioning(self):
-        semantic_sectioning_config = {
-            "use_semantic_sectioning": True,
-            "llm_provider": "anthropic",
-            "model": "claude-3-5-haiku-latest",
-            "language": "en",
-            "llm_max_concurrent_requests": 3  # For parallel processing
-        }
+    def _run_provider_semantic_sectioning(self, provider, model, client=None):
+        return get_sections_from_str(**self._provider_sectioning_kwargs(provider, model, client))
 
-        chunking_config = { 
-            "min_length_for_chunking": 1000
-        }
-        
-        sections, document_lines = get_sections_from_str(
-            document=self.longer_document,
-            max_characters_per_window=5000,  # Smaller windows to test parallelization
-            semantic_sectioning_config=semantic_sectioning_config,
-            chunking_config=chunking_config
-        )
-        
-        self._validate_sections(sections, document_lines)
+    async def _run_all_providers_in_parallel(self, clients=None):
+        clients = clients or {}
+        tasks = [
+            get_sections_from_str_async(**self._provider_sectioning_kwargs(provider, model, clients.get(provider)))
+            for provider, model in PROVIDERS
+        ]
+        return await asyncio.gather(*tasks, return_exceptions=True)
 
-    def test_gemini_semantic_sectioning(self):
-        semantic_sectioning_config = {
-            "use_semantic_sectioning": True,
-            "llm_provider": "gemini",
-            "model": "gemini-2.0-flash",
-            "language": "en",
-            "llm_max_concurrent_requests": 3  # For parallel processing
-        }
+    def _validate_provider_results(self, results):
+        for (provider, _), result in zip(PROVIDERS, results):
+            with self.subTest(provider=provider):
+                if isinstance(result, Exception):
+                    raise result
+                sections, document_lines = result
+                self._validate_sections(sections, document_lines)
 
-        chunking_config = { 
-            "min_length_for_chunking": 1000
-        }
-        
-        sections, document_lines = get_sections_from_str(
-            document=self.longer_document,
-            max_characters_per_window=5000,  # Smaller windows to test parallelization
-            semantic_sectioning_config=semantic_sectioning_config,
-            chunking_config=chunking_config
-        )
-        
-        self._validate_sections(sections, document_lines)
+    async def test_all_providers_in_parallel(self):
+        replays = {provider: self._mock_window_response(provider, self._windows_5000) for provider, _ in PROVIDERS}
+
+        def side_effect(window_text_with_lines, first_line_number_in_window_prompt, llm_provider, *args, **kwargs):
+            return replays[llm_provider](window_text_with_lines, first_line_number_in_window_prompt, llm_provider, *args, **kwargs)
+
+        with patch('dsparse.sectioning_and_chunking.semantic_sectioning.process_window_with_retries') as mock_process_window:
+            mock_process_window.side_effect = side_effect
+            results = await self._run_all_providers_in_parallel()
+
+        self._validate_provider_results(results)
+        self.assertEqual(mock_process_window.call_count, len(PROVIDERS) * len(self._windows_5000))
+
+    @unittest.skipUnless(os.getenv("DSRAG_LIVE_LLM") == "1", "live LLM tests require DSRAG_LIVE_LLM=1")
+    async def test_live_semantic_sectioning(self):
+        results = await self._run_all_providers_in_parallel(clients=self._live_clients)
+        self._validate_provider_results(results)
 
     def test_no_semantic_sectioning(self):
         semantic_sectioning_config = {
@@ -184,10 +294,23 @@ The potential for AI to improve healthcare delivery remains high, but careful co
         self.assertEqual(sections[0]['content'], self.test_document_short)
 
     def test_concurrency_levels(self):
-        """Test different concurrency levels"""
-        # This test specifically tests that different llm_max_concurrent_requests values work
-        
+        """Test that llm_max_concurrent_requests bounds the number of in-flight LLM calls"""
+        num_windows = len(self._windows_3000)
+        replay_window = self._mock_window_response("openai", self._windows_3000)
+
         for concurrency in [1, 2, 4]:
+            in_flight = {"current": 0, "max": 0}
+            lock = threading.Lock()
+
+            def side_effect(*args, **kwargs):
+                with lock:
+                    in_flight["current"] += 1
+                    in_flight["max"] = max(in_flight["max"], in_flight["current"])
+                time.sleep(0.05)  # Simulated LLM latency so that calls overlap
+                with lock:
+                    in_flight["current"] -= 1
+                return replay_window(*args, **kwargs)
+
             semantic_sectioning_config = {
                 "use_semantic_sectioning": True,
                 "llm_provider": "openai",
@@ -199,31 +322,83 @@ The potential for AI to improve healthcare delivery remains high, but careful co
             chunking_config = { 
                 "min_length_for_chunking": 1000
             }
+
+            with self.subTest(concurrency=concurrency), \
+                    patch('dsparse.sectioning_and_chunking.semantic_sectioning.process_window_with_retries') as mock_process_window:
+                mock_process_window.side_effect = side_effect
+                t0 = time.perf_counter()
+                sections, document_lines = get_sections_from_str(
+                    document=self.longer_document,
+                    max_characters_per_window=3000,  # Small windows to force multiple chunks
+                    semantic_sectioning_config=semantic_sectioning_config,
+                    chunking_config=chunking_config
+                )
+                self._metrics.append((concurrency, len(sections), time.perf_counter() - t0))
             
+                self._validate_sections(sections, document_lines)
+                self.assertEqual(mock_process_window.call_count, num_windows)
+                self.assertEqual(in_flight["max"], min(concurrency, num_windows))
+
+        # Timings are reported for information only - the in-flight count above is what's asserted,
+        # since wall-clock time depends on the machine running the tests
+        if "-v" in sys.argv or "--verbose" in sys.argv:
+            print("\n".join(
+                f"Concurrency level {concurrency} produced {num_sections} sections in {elapsed:.2f}s"
+                for concurrency, num_sections, elapsed in self._metrics
+            ))
+
+    def test_repeated_sectioning_hits_window_cache(self):
+        """Test that sectioning the same document again is served entirely from the window cache"""
+        cache = _WindowCache()
+        replay_window = Mock(side_effect=self._mock_window_response("openai", self._windows_5000))
+
+        def side_effect(window_text_with_lines, *args, **kwargs):
+            return cache.get_or_compute(
+                window_text_with_lines, lambda: replay_window(window_text_with_lines, *args, **kwargs)
+            )
+
+        with patch('dsparse.sectioning_and_chunking.semantic_sectioning.process_window_with_retries', side_effect=side_effect):
+            first_sections, _ = self._run_provider_semantic_sectioning("openai", "gpt-4.1-mini")
+            second_sections, document_lines = self._run_provider_semantic_sectioning("openai", "gpt-4.1-mini")
+
+        self._validate_sections(second_sections, document_lines)
+        self.assertEqual(first_sections, second_sections)
+        self.assertEqual(replay_window.call_count, len(self._windows_5000))
+        self.assertEqual(cache.misses, len(self._windows_5000))
+        self.assertGreaterEqual(cache.hits, 2)
+
+    @unittest.skipUnless(os.getenv("DSRAG_STRESS") == "1", "stress tests require DSRAG_STRESS=1")
+    def test_stress_100x(self):
+        """Stress the parallel window path with a much larger document"""
+        document = self._make_doc(100)
+        _, windows = self._precompute_windows(document, 5000)
+
+        with patch('dsparse.sectioning_and_chunking.semantic_sectioning.process_window_with_retries') as mock_process_window:
+            mock_process_window.side_effect = self._mock_window_response("openai", windows)
             sections, document_lines = get_sections_from_str(
-                document=self.longer_document,
-                max_characters_per_window=3000,  # Small windows to force multiple chunks
-                semantic_sectioning_config=semantic_sectioning_config,
-                chunking_config=chunking_config
+                document=document,
+                max_characters_per_window=5000,
+                semantic_sectioning_config={
+                    "use_semantic_sectioning": True,
+                    "llm_provider": "openai",
+                    "model": "gpt-4.1-mini",
+                    "llm_max_concurrent_requests": 8
+                },
+                chunking_config={"min_length_for_chunking": 1000}
             )
-            
-            self._validate_sections(sections, document_lines)
-            
-            # Output concurrency level and number of sections found
-            print(f"Concurrency level {concurrency} produced {len(sections)} sections")
 
-    @patch('dsparse.sectioning_and_chunking.semantic_sectioning.process_window_with_retries')
+        self._validate_sections(sections, document_lines)
+        self.assertEqual(mock_process_window.call_count, len(windows))
+
+    @patch('dsparse.sectioning_and_chunking.semantic_sectioning.process_window_with_retries', autospec=True)
     def test_safeguard_integration(self, mock_process_window):
         """Integration test: Verify safeguard works through parse_and_chunk"""
         # Create a sample text file content
         sample_text = "\n".join(["This is line number " + str(i) for i in range(100)])
         
         # Mock to return excessive small sections
-        mock_result = Mock()
-        mock_result.sections = [
-            DocumentSection(title=f"Tiny Section {i}", start_index=i) 
-            for i in range(50)  # 50 sections for ~100 lines = way too many
-        ]
+        mock_result = Mock(spec=['sections'])
+        mock_result.sections = list(self._EXCESSIVE_SECTIONS)
         mock_process_window.return_value = mock_result
         
         # Call parse_and_chunk with semantic sectioning enabled
@@ -243,6 +418,9 @@ The potential for AI to improve healthcare delivery remains high, but careful co
             }
         )
         
+        # The whole document fits in one window
+        mock_process_window.assert_called_once()
+
         # The safeguard should have consolidated sections
         # We expect only 1 section (the consolidated one)
         self.assertEqual(len(sections), 1)
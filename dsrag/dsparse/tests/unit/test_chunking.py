@@ -2,11 +2,14 @@ import os
 import sys
 import unittest
 import json
+from unittest.mock import patch
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from dsparse.models.types import Chunk
 from dsparse.sectioning_and_chunking.chunking import find_lines_in_range, chunk_sub_section, chunk_document
+from dsparse.sectioning_and_chunking.semantic_sectioning import get_sections_from_str
+from dsparse.main import parse_and_chunk_no_vlm
 
 class TestChunking(unittest.TestCase):
     def test__chunk_document(self):
@@ -233,5 +236,29 @@ class TestChunking(unittest.TestCase):
             self.assertLess(end, len(document_lines))
             self.assertLessEqual(start, end)
 
+    def test_parse_and_chunk_text_without_semantic_sectioning(self):
+        """Plain text without semantic sectioning chunks the same as the general path"""
+        text = "\n".join(f"Line {i} with some content about the topic." for i in range(100))
+        chunking_config = {"chunk_size": 200, "min_length_for_chunking": 400}
+
+        with patch("dsparse.main.get_sections_from_str") as mock_get_sections:
+            sections, chunks = parse_and_chunk_no_vlm(
+                semantic_sectioning_config={"use_semantic_sectioning": False},
+                chunking_config=chunking_config,
+                kb_id="test_kb",
+                doc_id="test_doc",
+                text=text,
+            )
+            mock_get_sections.assert_not_called()
+
+        expected_sections, document_lines = get_sections_from_str(
+            document=text,
+            semantic_sectioning_config={"use_semantic_sectioning": False},
+            chunking_config=chunking_config,
+        )
+        self.assertEqual(sections, expected_sections)
+        self.assertEqual(chunks, chunk_document(sections=expected_sections, document_lines=document_lines, chunk_size=200, min_length_for_chunking=400))
+        self.assertGreater(len(chunks), 1)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
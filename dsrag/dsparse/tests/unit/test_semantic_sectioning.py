@@ -18,6 +18,7 @@ from dsparse.sectioning_and_chunking.semantic_sectioning import (
     validate_and_fix_global_sections,
     get_sections,
     get_sections_from_str,
+    get_structured_document_for_window,
 )
 
 class TestSemanticSectioning(unittest.TestCase):
@@ -244,7 +245,54 @@ class TestSemanticSectioning(unittest.TestCase):
             self.assertIn("content", section)
             self.assertIn("start", section)
             self.assertIn("end", section)
-    
+
+    @patch('dsparse.sectioning_and_chunking.semantic_sectioning.get_structured_document_for_window')
+    def test_get_sections_reuses_client(self, mock_get_structured_doc):
+        """Test that a provided client is passed to the LLM call for every window"""
+        mock_response = Mock()
+        mock_response.sections = [DocumentSection(title="Test Section", start_index=0)]
+        mock_get_structured_doc.return_value = mock_response
+        shared_client = Mock()
+
+        get_sections(
+            document_lines=self.document_lines,
+            max_characters_per_window=200,
+            llm_provider="openai",
+            model="gpt-4o-mini",
+            language="en",
+            llm_max_concurrent_requests=2,
+            client=shared_client
+        )
+
+        # Multiple windows should have been processed, all with the same client
+        self.assertGreater(mock_get_structured_doc.call_count, 1)
+        for call in mock_get_structured_doc.call_args_list:
+            self.assertIs(call.kwargs["client"], shared_client)
+
+    @patch('dsparse.sectioning_and_chunking.semantic_sectioning.get_structured_document_for_window')
+    @patch('dsparse.sectioning_and_chunking.semantic_sectioning.get_instructor_client')
+    def test_get_sections_from_str_creates_one_client(self, mock_get_instructor_client, mock_get_structured_doc):
+        """Test that without a client, one is created and shared by every window"""
+        mock_response = Mock()
+        mock_response.sections = [DocumentSection(title="Test Section", start_index=0)]
+        mock_get_structured_doc.return_value = mock_response
+
+        get_sections_from_str(
+            document=self.sample_document,
+            max_characters_per_window=200,
+            semantic_sectioning_config={"llm_provider": "openai", "model": "gpt-4o-mini", "language": "en"},
+        )
+
+        mock_get_instructor_client.assert_called_once_with("openai", "gpt-4o-mini")
+        self.assertGreater(mock_get_structured_doc.call_count, 1)
+        for call in mock_get_structured_doc.call_args_list:
+            self.assertIs(call.kwargs["client"], mock_get_instructor_client.return_value)
+
+    def test_invalid_provider_with_client(self):
+        """Test that an unknown provider is rejected even when a client is provided"""
+        with self.assertRaises(ValueError):
+            get_structured_document_for_window("[0] Line 0", 0, "not_a_provider", "model", "en", client=Mock())
+
     def test_split_long_line(self):
         """Test splitting long lines"""
         # Short line doesn't need splitting
@@ -1,10 +1,14 @@
 import numpy as np
 import os
+import asyncio
 import time
 import uuid
 import logging
+import threading
+from collections import OrderedDict
 from typing import Optional, Union, Dict, List
 import concurrent.futures
+import functools
 from tqdm import tqdm
 
 from dsrag.dsparse.main import parse_and_chunk
@@ -12,13 +16,14 @@ from dsrag.add_document import (
     auto_context, 
     get_embeddings, 
     add_chunks_to_db, 
-    add_vectors_to_db,
+    get_vector_metadata,
 )
 from dsrag.auto_context import get_segment_header
 from dsrag.rse import (
     get_relevance_values,
     get_best_segments,
     get_meta_document,
+    get_relevant_segment_info,
     RSE_PARAMS_PRESETS,
 )
 from dsrag.database.vector import Vector, VectorDB, BasicVectorDB
@@ -31,6 +36,39 @@ from dsrag.dsparse.file_parsing.file_system import FileSystem, LocalFileSystem
 from dsrag.metadata import MetadataStorage, LocalMetadataStorage
 from dsrag.chat.citations import convert_elements_to_page_content
 
+# Query embeddings are cached per KnowledgeBase, keyed on the exact query text
+QUERY_EMBEDDING_CACHE_SIZE = 10000
+QUERY_EMBEDDING_CACHE_TTL = 3600  # seconds
+
+# Number of results retrieved from the vector DB for each search query, before reranking and RSE
+SEARCH_TOP_K = 200
+
+# Thread pool shared by every query's search and content retrieval steps, created on first use
+_query_pool = None
+_query_pool_lock = threading.Lock()
+
+
+def _get_query_pool() -> concurrent.futures.ThreadPoolExecutor:
+    """Returns the shared query thread pool, so each query doesn't start and stop its own threads"""
+    global _query_pool
+    with _query_pool_lock:
+        if _query_pool is None:
+            _query_pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(32, (os.cpu_count() or 1) * 4), thread_name_prefix="dsrag-query"
+            )
+    return _query_pool
+
+
+def _init_parsing_worker():
+    """Imports the parsing stack once per worker process, instead of on its first document"""
+    import dsrag.dsparse.main  # noqa: F401
+
+
+def _parse_and_chunk_in_worker(file_system_config: dict, **kwargs):
+    """Runs parse_and_chunk in a worker process, rebuilding the file system from its config"""
+    return parse_and_chunk(file_system=FileSystem.from_dict(file_system_config), **kwargs)
+
+
 class KnowledgeBase:
     def __init__(
         self,
@@ -80,7 +118,14 @@ class KnowledgeBase:
             ValueError: If KB exists and exists_ok is False.
         """
         self.kb_id = kb_id
+        self._save_suspended = False
+        # query text -> (embedding, time cached), least recently used first
+        self._query_embedding_cache = OrderedDict()
+        self._query_embedding_cache_lock = threading.Lock()
         self.storage_directory = os.path.expanduser(storage_directory)
+        # resolve these paths once, rather than on every call
+        self._metadata_path = os.path.join(self.storage_directory, "metadata", f"{self.kb_id}.json")
+        self._page_images_path = os.path.join(self.storage_directory, "page_images")
         self.metadata_storage = metadata_storage if metadata_storage else LocalMetadataStorage(self.storage_directory)
 
         if save_metadata_to_disk:
@@ -124,7 +169,7 @@ class KnowledgeBase:
         Returns:
             str: Path to the metadata JSON file.
         """
-        return os.path.join(self.storage_directory, "metadata", f"{self.kb_id}.json")
+        return self._metadata_path
 
     def _initialize_components(
         self,
@@ -152,14 +197,18 @@ class KnowledgeBase:
         self.chunk_db = (
             chunk_db if chunk_db else BasicChunkDB(self.kb_id, self.storage_directory)
         )
-        self.file_system = file_system if file_system else LocalFileSystem(base_path=os.path.join(self.storage_directory, "page_images"))
+        self.file_system = file_system if file_system else LocalFileSystem(base_path=self._page_images_path)
         self.vector_dimension = self.embedding_model.dimension
 
     def _save(self):
         """Save the knowledge base configuration to disk.
 
-        Internal method to serialize components and metadata.
+        Internal method to serialize components and metadata. Does nothing while saving is
+        suspended, e.g. during add_documents, which saves once at the end instead.
         """
+        if self._save_suspended:
+            return
+
         # Serialize components
         components = {
             "embedding_model": self.embedding_model.to_dict(),
@@ -417,132 +466,28 @@ class KnowledgeBase:
 
         try:
             # Handle the backwards compatibility for chunk_size and min_length_for_chunking
+            # (merged into a new dict, so the caller's config - or the shared default - isn't modified)
             if chunk_size is not None:
-                chunking_config["chunk_size"] = chunk_size
+                chunking_config = {**chunking_config, "chunk_size": chunk_size}
             if min_length_for_chunking is not None:
-                chunking_config["min_length_for_chunking"] = min_length_for_chunking
-            
-            # verify that either text or file_path is provided
-            if text == "" and file_path == "":
-                raise ValueError("Either text or file_path must be provided")
-
-            # verify that the document does not already exist in the KB - the doc_id should be unique
-            if doc_id in self.chunk_db.get_all_doc_ids():
-                ingestion_logger.warning(
-                    "Document already exists in knowledge base, skipping", 
-                    extra=base_extra
-                )
-                return
-            
-            # verify the doc_id is valid
-            if "/" in doc_id:
-                raise ValueError("doc_id cannot contain '/' characters")
-            
-            # --- Parsing and Chunking Step ---
-            step_start_time = time.perf_counter()
-            sections, chunks = parse_and_chunk(
-                kb_id=self.kb_id,
-                doc_id=doc_id,
-                file_path=file_path, 
-                text=text, 
-                file_parsing_config=file_parsing_config, 
-                semantic_sectioning_config=semantic_sectioning_config, 
-                chunking_config=chunking_config,
-                file_system=self.file_system,
-            )
-            step_duration = time.perf_counter() - step_start_time
-            ingestion_logger.debug("Parsing and Chunking complete", extra={
-                **base_extra, 
-                "step": "parse_chunk", 
-                "duration_s": round(step_duration, 4),
-                "num_sections": len(sections), 
-                "num_chunks": len(chunks)
-            })
+                chunking_config = {**chunking_config, "min_length_for_chunking": min_length_for_chunking}
 
-            # construct full document text from sections (for auto_context)
-            document_text = ""
-            for section in sections:
-                document_text += section["content"]
-
-            # --- AutoContext Step ---
-            chunks, chunks_to_embed = auto_context(
-                kb_id=self.kb_id,
-                auto_context_model=self.auto_context_model,
-                sections=sections,
-                chunks=chunks,
-                text=document_text,
+            prepared_document = self._prepare_document(
                 doc_id=doc_id,
+                text=text,
+                file_path=file_path,
                 document_title=document_title,
                 auto_context_config=auto_context_config,
-                language=self.kb_metadata.get("language", "en"),
-            )
-            
-            # --- Embedding Step ---
-            step_start_time = time.perf_counter()
-            chunk_embeddings = get_embeddings(
-                embedding_model=self.embedding_model,
-                chunks_to_embed=chunks_to_embed,
-            )
-            step_duration = time.perf_counter() - step_start_time
-            ingestion_logger.debug("Embedding complete", extra={
-                **base_extra, 
-                "step": "embedding", 
-                "duration_s": round(step_duration, 4),
-                "num_embeddings": len(chunk_embeddings), 
-                "model": self.embedding_model.__class__.__name__
-            })
-            
-            # --- DB Storage Step ---
-            step_start_time = time.perf_counter()
-            add_chunks_to_db(
-                chunk_db=self.chunk_db,
-                chunks=chunks,
-                chunks_to_embed=chunks_to_embed,
-                chunk_embeddings=chunk_embeddings,
-                metadata=metadata,
-                doc_id=doc_id,
-                supp_id=supp_id
-            )
-            add_vectors_to_db(
-                vector_db=self.vector_db,
-                chunks=chunks,
-                chunk_embeddings=chunk_embeddings,
+                file_parsing_config=file_parsing_config,
+                semantic_sectioning_config=semantic_sectioning_config,
+                chunking_config=chunking_config,
+                supp_id=supp_id,
                 metadata=metadata,
-                doc_id=doc_id,
             )
-            step_duration = time.perf_counter() - step_start_time
-            ingestion_logger.debug("Database storage complete", extra={
-                **base_extra,
-                "step": "db_storage", 
-                "duration_s": round(step_duration, 4),
-                "vector_db": self.vector_db.__class__.__name__,
-                "chunk_db": self.chunk_db.__class__.__name__
-            })
+            if prepared_document is None:
+                return
 
-            # Convert elements to page content if the document was processed with page numbers
-            if file_path and file_parsing_config.get('use_vlm', False):
-                try:
-                    step_start_time = time.perf_counter()
-                    elements = self.file_system.load_data(kb_id=self.kb_id, doc_id=doc_id, data_name="elements")
-                    if elements:
-                        convert_elements_to_page_content(
-                            elements=elements,
-                            kb_id=self.kb_id,
-                            doc_id=doc_id,
-                            file_system=self.file_system
-                        )
-                    step_duration = time.perf_counter() - step_start_time
-                    ingestion_logger.debug("Page content conversion complete", extra={
-                        **base_extra,
-                        "step": "page_content", 
-                        "duration_s": round(step_duration, 4),
-                        "num_elements": len(elements) if elements else 0
-                    })
-                except Exception as e:
-                    ingestion_logger.warning(
-                        "Failed to load or process elements for page content", 
-                        extra={**base_extra, "error": str(e)}
-                    )
+            self._persist_documents([prepared_document])
 
             self._save()  # save to disk after adding a document
             
@@ -568,14 +513,231 @@ class KnowledgeBase:
             # Re-raise the exception
             raise
 
+    def _prepare_document(
+        self,
+        doc_id: str,
+        text: str,
+        file_path: str,
+        document_title: str,
+        auto_context_config: dict,
+        file_parsing_config: dict,
+        semantic_sectioning_config: dict,
+        chunking_config: dict,
+        supp_id: str,
+        metadata: dict,
+        skip_existence_check: bool = False,
+        parsing_executor: Optional[concurrent.futures.ProcessPoolExecutor] = None,
+    ) -> Optional[dict]:
+        """Parse, chunk and run AutoContext on a document, without embedding or storing it.
+
+        Internal method shared by add_document and add_documents. Returns None if the document
+        is already in the knowledge base. Callers that have already checked the doc_id against the
+        chunk DB can set skip_existence_check to avoid reading every doc_id again. If a
+        parsing_executor is given, parsing and chunking run in one of its worker processes.
+        """
+        ingestion_logger = logging.getLogger("dsrag.ingestion")
+        base_extra = {"kb_id": self.kb_id, "doc_id": doc_id}
+
+        # verify that either text or file_path is provided
+        if text == "" and file_path == "":
+            raise ValueError("Either text or file_path must be provided")
+
+        # verify the doc_id is valid - checked before the chunk DB lookup, which reads every doc_id
+        if "/" in doc_id:
+            raise ValueError("doc_id cannot contain '/' characters")
+
+        # verify that the document does not already exist in the KB - the doc_id should be unique.
+        # This happens before any parsing, so skipping a document costs no parsing or LLM calls.
+        if not skip_existence_check and doc_id in self.chunk_db.get_all_doc_ids():
+            ingestion_logger.warning(
+                "Document already exists in knowledge base, skipping", 
+                extra={**base_extra, "step": "skip_existing", "duration_s": 0}
+            )
+            return None
+        
+        # --- Parsing and Chunking Step ---
+        step_start_time = time.perf_counter()
+        parse_and_chunk_kwargs = dict(
+            kb_id=self.kb_id,
+            doc_id=doc_id,
+            file_path=file_path, 
+            text=text, 
+            file_parsing_config=file_parsing_config, 
+            semantic_sectioning_config=semantic_sectioning_config, 
+            chunking_config=chunking_config,
+        )
+        if parsing_executor is not None:
+            sections, chunks = parsing_executor.submit(
+                _parse_and_chunk_in_worker, self.file_system.to_dict(), **parse_and_chunk_kwargs
+            ).result()
+        else:
+            sections, chunks = parse_and_chunk(file_system=self.file_system, **parse_and_chunk_kwargs)
+        step_duration = time.perf_counter() - step_start_time
+        ingestion_logger.debug("Parsing and Chunking complete", extra={
+            **base_extra, 
+            "step": "parse_chunk", 
+            "duration_s": round(step_duration, 4),
+            "num_sections": len(sections), 
+            "num_chunks": len(chunks)
+        })
+
+        # construct full document text from sections (for auto_context)
+        document_text = "".join(section["content"] for section in sections)
+
+        # --- AutoContext Step ---
+        chunks, chunks_to_embed = auto_context(
+            kb_id=self.kb_id,
+            auto_context_model=self.auto_context_model,
+            sections=sections,
+            chunks=chunks,
+            text=document_text,
+            doc_id=doc_id,
+            document_title=document_title,
+            auto_context_config=auto_context_config,
+            language=self.kb_metadata.get("language", "en"),
+        )
+
+        return {
+            "doc_id": doc_id,
+            "chunks": chunks,
+            "chunks_to_embed": chunks_to_embed,
+            "metadata": metadata,
+            "supp_id": supp_id,
+            "file_path": file_path,
+            "file_parsing_config": file_parsing_config,
+        }
+
+    def _persist_documents(self, prepared_documents: list[dict]):
+        """Embed and store a batch of documents returned by _prepare_document.
+
+        Internal method. The chunks of every document are embedded together and written to the
+        vector database in a single call, so a batch of short documents doesn't pay the per-request
+        overhead of the embedding API and the vector DB once per document.
+
+        The vectors are written before the chunk rows, since a document with chunk rows counts as
+        existing. If storage fails, whatever was written for the batch is removed again before the
+        error is raised, so a re-run doesn't skip documents that can't be found by search.
+        """
+        ingestion_logger = logging.getLogger("dsrag.ingestion")
+        # Documents finish preparing in arbitrary order. Sorting them by doc_id means the vectors are
+        # written in (doc_id, chunk_index) order, which ordered indexes can append without reshuffling.
+        prepared_documents = sorted(prepared_documents, key=lambda doc: doc["doc_id"])
+        doc_ids = [doc["doc_id"] for doc in prepared_documents]
+        if len(doc_ids) == 1:
+            base_extra = {"kb_id": self.kb_id, "doc_id": doc_ids[0]}
+        else:
+            base_extra = {"kb_id": self.kb_id, "doc_ids": doc_ids}
+
+        # --- Embedding Step ---
+        step_start_time = time.perf_counter()
+        all_chunk_embeddings = get_embeddings(
+            embedding_model=self.embedding_model,
+            chunks_to_embed=[chunk for doc in prepared_documents for chunk in doc["chunks_to_embed"]],
+        )
+        step_duration = time.perf_counter() - step_start_time
+        ingestion_logger.debug("Embedding complete", extra={
+            **base_extra, 
+            "step": "embedding", 
+            "duration_s": round(step_duration, 4),
+            "num_embeddings": len(all_chunk_embeddings), 
+            "model": self.embedding_model.__class__.__name__
+        })
+        
+        # --- DB Storage Step ---
+        step_start_time = time.perf_counter()
+        vector_metadata = []
+        for doc in prepared_documents:
+            vector_metadata += get_vector_metadata(
+                chunks=doc["chunks"],
+                metadata=doc["metadata"],
+                doc_id=doc["doc_id"],
+            )
+        try:
+            # the documents' embeddings are already contiguous and in order, so they go in as one array
+            self.vector_db.add_vectors(vectors=all_chunk_embeddings, metadata=vector_metadata)
+
+            offset = 0
+            for doc in prepared_documents:
+                # split the embeddings back out per document
+                num_chunks = len(doc["chunks_to_embed"])
+                chunk_embeddings = all_chunk_embeddings[offset:offset + num_chunks]
+                offset += num_chunks
+
+                add_chunks_to_db(
+                    chunk_db=self.chunk_db,
+                    chunks=doc["chunks"],
+                    chunks_to_embed=doc["chunks_to_embed"],
+                    chunk_embeddings=chunk_embeddings,
+                    metadata=doc["metadata"],
+                    doc_id=doc["doc_id"],
+                    supp_id=doc["supp_id"]
+                )
+        except Exception:
+            # don't leave documents half-written
+            for doc_id in doc_ids:
+                for db in (self.chunk_db, self.vector_db):
+                    try:
+                        db.remove_document(doc_id)
+                    except Exception as cleanup_error:
+                        ingestion_logger.warning(
+                            "Failed to clean up after document storage failed",
+                            extra={"kb_id": self.kb_id, "doc_id": doc_id, "error": str(cleanup_error)}
+                        )
+            raise
+        step_duration = time.perf_counter() - step_start_time
+        ingestion_logger.debug("Database storage complete", extra={
+            **base_extra,
+            "step": "db_storage", 
+            "duration_s": round(step_duration, 4),
+            "vector_db": self.vector_db.__class__.__name__,
+            "chunk_db": self.chunk_db.__class__.__name__
+        })
+
+        # Convert elements to page content if the document was processed with page numbers
+        for doc in prepared_documents:
+            if doc["file_path"] and doc["file_parsing_config"].get('use_vlm', False):
+                doc_extra = {"kb_id": self.kb_id, "doc_id": doc["doc_id"], "file_path": doc["file_path"]}
+                if self.file_system.page_content_exists(self.kb_id, doc["doc_id"]):
+                    # Nothing to convert, so don't load and parse the elements file
+                    ingestion_logger.debug("Page content already exists, skipping conversion", extra=doc_extra)
+                    continue
+                try:
+                    step_start_time = time.perf_counter()
+                    elements = self.file_system.load_data(kb_id=self.kb_id, doc_id=doc["doc_id"], data_name="elements")
+                    if elements:
+                        convert_elements_to_page_content(
+                            elements=elements,
+                            kb_id=self.kb_id,
+                            doc_id=doc["doc_id"],
+                            file_system=self.file_system
+                        )
+                    step_duration = time.perf_counter() - step_start_time
+                    ingestion_logger.debug("Page content conversion complete", extra={
+                        **doc_extra,
+                        "step": "page_content", 
+                        "duration_s": round(step_duration, 4),
+                        "num_elements": len(elements) if elements else 0
+                    })
+                except Exception as e:
+                    ingestion_logger.warning(
+                        "Failed to load or process elements for page content", 
+                        extra={**doc_extra, "error": str(e)}
+                    )
+
     def add_documents(
         self,
         documents: List[Dict[str, Union[str, dict]]],
         max_workers: int = 1,
         show_progress: bool = True,
         rate_limit_pause: float = 1.0,
+        batch_size: int = 256,
+        cpu_workers: int = 0,
     ) -> List[str]:
         """Add multiple documents to the knowledge base in parallel.
+
+        Synchronous wrapper around aadd_documents. It can also be called from code that is already
+        running an event loop (e.g. a Jupyter notebook), in which case aadd_documents is run on a
+        separate thread.
         
         Args:
             documents (List[Dict[str, Union[str, dict]]]): List of document dictionaries. Each must contain:
@@ -591,96 +753,226 @@ class KnowledgeBase:
                 - 'chunking_config' (dict): Chunking configuration
                 - 'supp_id' (str): Supplementary identifier
                 - 'metadata' (dict): Additional metadata
-            max_workers (int, optional): Maximum number of worker threads. Defaults to 1.
+            max_workers (int, optional): Maximum number of documents processed concurrently. Defaults to 1.
             show_progress (bool, optional): Whether to show a progress bar. Defaults to True.
             rate_limit_pause (float, optional): Pause between uploads in seconds. Defaults to 1.0.
+            batch_size (int, optional): Minimum number of chunks to accumulate across documents before
+                they are embedded and written to the databases together. Defaults to 256.
+            cpu_workers (int, optional): Number of worker processes for file parsing and chunking, which
+                are CPU-bound and don't benefit from extra threads. Documents are still processed up to
+                max_workers at a time. Set to 0 to parse in the worker threads instead. Defaults to 0.
 
         Returns:
             List[str]: List of successfully uploaded document IDs.
 
         Note:
-            Be sure to use thread-safe VectorDB and ChunkDB implementations when max_workers > 1.
-            The default implementations (BasicVectorDB and BasicChunkDB) are not thread-safe.
+            Parsing, chunking and AutoContext run in worker threads. Embedding and database writes
+            are done in batches of documents, one batch at a time. Be sure to use a thread-safe
+            FileSystem implementation when max_workers > 1.
+        """
+        coroutine = self.aadd_documents(
+            documents,
+            max_workers=max_workers,
+            show_progress=show_progress,
+            rate_limit_pause=rate_limit_pause,
+            batch_size=batch_size,
+            cpu_workers=cpu_workers,
+        )
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+
+        # asyncio.run can't be nested inside a running event loop, so give it a thread of its own
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coroutine).result()
+
+    async def aadd_documents(
+        self,
+        documents: List[Dict[str, Union[str, dict]]],
+        max_workers: int = 1,
+        show_progress: bool = True,
+        rate_limit_pause: float = 1.0,
+        batch_size: int = 256,
+        cpu_workers: int = 0,
+    ) -> List[str]:
+        """Async version of add_documents. See add_documents for the arguments.
+
+        Concurrency is bounded by an asyncio.Semaphore of size max_workers. The parsing, LLM and
+        embedding calls are blocking, so each one runs on a thread pool created for this call (the
+        event loop's default executor caps its thread count below what max_workers may ask for),
+        while the rate limit pause is an asyncio.sleep that doesn't hold up any thread.
         """
+        ingestion_logger = logging.getLogger("dsrag.ingestion")
         successful_uploads = []
+        semaphore = asyncio.Semaphore(max_workers)
+        loop = asyncio.get_running_loop()
+        # one thread per concurrent document, plus one so storing a batch doesn't wait for a free thread
+        thread_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers + 1, thread_name_prefix="dsrag-ingestion"
+        )
+
+        def run_in_thread(func, *args, **kwargs):
+            return loop.run_in_executor(thread_executor, functools.partial(func, *args, **kwargs))
+
+        existing_doc_ids = set()
+        claimed_doc_ids = set()
         
-        def process_document(doc: Dict) -> Optional[str]:
+        async def process_document(doc: Dict) -> Optional[tuple]:
             try:
                 # Extract required parameters
                 doc_id = doc['doc_id']
-                print(f"Starting to process document: {doc_id}")  # Debug log
-                
-                # Create a copy of the document dict to avoid modification during iteration
-                doc_params = doc.copy()
-                
-                # Extract required parameters from the copy
-                text = doc_params.get('text', '')
-                file_path = doc_params.get('file_path', '')
-                
-                # Extract optional parameters with defaults
-                document_title = doc_params.get('document_title', '')
-                auto_context_config = doc_params.get('auto_context_config', {}).copy()
-                file_parsing_config = doc_params.get('file_parsing_config', {}).copy()
-                semantic_sectioning_config = doc_params.get('semantic_sectioning_config', {}).copy()
-                chunking_config = doc_params.get('chunking_config', {}).copy()
-                supp_id = doc_params.get('supp_id', '')
-                metadata = doc_params.get('metadata', {}).copy()
+                base_extra = {"kb_id": self.kb_id, "doc_id": doc_id}
+                if doc_id in existing_doc_ids:
+                    ingestion_logger.warning(
+                        "Document already exists in knowledge base, skipping",
+                        extra={**base_extra, "step": "skip_existing", "duration_s": 0}
+                    )
+                    return doc_id, None
+                if doc_id in claimed_doc_ids:
+                    ingestion_logger.warning(
+                        "Duplicate document in add_documents, skipping",
+                        extra=base_extra
+                    )
+                    return None
+                claimed_doc_ids.add(doc_id)
+
+                # The checks above need no parsing, so skipped documents don't wait for a worker slot
+                async with semaphore:
+                    ingestion_logger.debug("Starting document ingestion", extra=base_extra)
                 
-                print(f"Extracted parameters for {doc_id}")  # Debug log
+                    # Extract required parameters
+                    text = doc.get('text', '')
+                    file_path = doc.get('file_path', '')
                 
-                # Call add_document with extracted parameters
-                self.add_document(
-                    doc_id=doc_id,
-                    text=text,
-                    file_path=file_path,
-                    document_title=document_title,
-                    auto_context_config=auto_context_config,
-                    file_parsing_config=file_parsing_config,
-                    semantic_sectioning_config=semantic_sectioning_config,
-                    chunking_config=chunking_config,
-                    supp_id=supp_id,
-                    metadata=metadata
-                )
+                    # Extract optional parameters with defaults. Ingestion treats the configs as read-only,
+                    # so they're passed through without copying.
+                    document_title = doc.get('document_title', '')
+                    auto_context_config = doc.get('auto_context_config', {})
+                    file_parsing_config = doc.get('file_parsing_config', {})
+                    semantic_sectioning_config = doc.get('semantic_sectioning_config', {})
+                    chunking_config = doc.get('chunking_config', {})
+                    supp_id = doc.get('supp_id', '')
+                    metadata = doc.get('metadata', {})
                 
-                print(f"Successfully processed document: {doc_id}")  # Debug log
+                    # Parse, chunk and run AutoContext - embedding and storage happen in batches below
+                    prepared_document = await run_in_thread(
+                        self._prepare_document,
+                        doc_id=doc_id,
+                        text=text,
+                        file_path=file_path,
+                        document_title=document_title,
+                        auto_context_config=auto_context_config,
+                        file_parsing_config=file_parsing_config,
+                        semantic_sectioning_config=semantic_sectioning_config,
+                        chunking_config=chunking_config,
+                        supp_id=supp_id,
+                        metadata=metadata,
+                        skip_existence_check=True,
+                        parsing_executor=parsing_executor
+                    )
                 
-                # Pause to avoid rate limits
-                time.sleep(rate_limit_pause)
-                return doc_id
+                    # Pause to avoid rate limits
+                    await asyncio.sleep(rate_limit_pause)
+                    return doc_id, prepared_document
                 
             except Exception as e:
-                import traceback
-                error_msg = f"Error processing document {doc.get('doc_id', 'unknown')}:\n"
-                error_msg += f"Error type: {type(e).__name__}\n"
-                error_msg += f"Error message: {str(e)}\n"
-                error_msg += "Traceback:\n"
-                error_msg += traceback.format_exc()
-                print(error_msg)
+                ingestion_logger.error(
+                    "Document ingestion failed",
+                    extra={"kb_id": self.kb_id, "doc_id": doc.get('doc_id', 'unknown'), "error": str(e)},
+                    exc_info=True
+                )
                 return None
 
-        # Process documents in parallel
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Create futures
-            future_to_doc = {
-                executor.submit(process_document, doc): doc 
-                for doc in documents
-            }
-            
+        pending_documents = []
+
+        def persist_documents(prepared_documents: list[dict]) -> bool:
+            try:
+                self._persist_documents(prepared_documents)
+            except Exception as e:
+                ingestion_logger.error(
+                    "Document batch storage failed" if len(prepared_documents) > 1 else "Document storage failed",
+                    extra={
+                        "kb_id": self.kb_id,
+                        "doc_ids": [doc["doc_id"] for doc in prepared_documents],
+                        "error": str(e)
+                    },
+                    exc_info=True
+                )
+                return False
+            for doc in prepared_documents:
+                ingestion_logger.info(
+                    "Document ingestion successful",
+                    extra={"kb_id": self.kb_id, "doc_id": doc["doc_id"]}
+                )
+                successful_uploads.append(doc["doc_id"])
+            return True
+
+        def persist_pending_documents():
+            # if the batch fails, retry it one document at a time so a single bad document doesn't
+            # take the rest of the batch down with it
+            if not persist_documents(pending_documents) and len(pending_documents) > 1:
+                for doc in pending_documents:
+                    persist_documents([doc])
+            pending_documents.clear()
+
+        parsing_executor = None
+        if cpu_workers > 0:
+            parsing_executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=cpu_workers, initializer=_init_parsing_worker
+            )
+
+        # Saving the KB config after every batch would just rewrite the same file, so save once at the end
+        self._save_suspended = True
+        try:
+            # Read the existing doc_ids once, rather than once per document. Everything below runs on the
+            # event loop thread, so the sets don't need a lock.
+            existing_doc_ids.update(await run_in_thread(self.chunk_db.get_all_doc_ids))
+
+            # Process documents concurrently
+            tasks = [asyncio.create_task(process_document(doc)) for doc in documents]
+        
             # Process results with optional progress bar
             if show_progress:
-                futures = tqdm(
-                    concurrent.futures.as_completed(future_to_doc),
+                # Redraw at most every 0.5% of documents and every half second, so large
+                # batches of quick documents don't spend their time refreshing the bar
+                results = tqdm(
+                    asyncio.as_completed(tasks),
                     total=len(documents),
-                    desc="Processing documents"
+                    desc="Processing documents",
+                    mininterval=0.5,
+                    miniters=max(1, len(documents) // 200)
                 )
             else:
-                futures = concurrent.futures.as_completed(future_to_doc)
-                
-            for future in futures:
-                doc_id = future.result()
-                if doc_id:
+                results = asyncio.as_completed(tasks)
+            
+            num_pending_chunks = 0
+            for next_result in results:
+                result = await next_result
+                if result is None:
+                    continue
+                doc_id, prepared_document = result
+                if prepared_document is None:
+                    # Document was already in the knowledge base
                     successful_uploads.append(doc_id)
-        
+                    continue
+
+                pending_documents.append(prepared_document)
+                num_pending_chunks += len(prepared_document["chunks_to_embed"])
+                if num_pending_chunks >= batch_size:
+                    # Other documents keep being prepared while this batch is stored
+                    await run_in_thread(persist_pending_documents)
+                    num_pending_chunks = 0
+
+            if pending_documents:
+                await run_in_thread(persist_pending_documents)
+        finally:
+            thread_executor.shutdown()
+            if parsing_executor is not None:
+                parsing_executor.shutdown()
+            self._save_suspended = False
+            self._save()
+
         return successful_uploads
 
     def delete_document(self, doc_id: str):
@@ -707,38 +999,77 @@ class KnowledgeBase:
         """
         return self.chunk_db.get_is_visual(doc_id, chunk_index)
     
-    def _get_chunk_content(self, doc_id: str, chunk_index: int) -> tuple[str, str]:
+    def _get_chunk_content(self, doc_id: str, chunk_index: int) -> Optional[str]:
         """Get the full content of a specific chunk.
 
         Internal method to retrieve chunk content.
         """
-        chunk_text = self.chunk_db.get_chunk_text(doc_id, chunk_index)
-        return chunk_text
+        return self.chunk_db.get_chunk_text(doc_id, chunk_index)
 
-    def _get_segment_header(self, doc_id: str, chunk_index: int) -> str:
+    def _get_segment_header(self, doc_id: str, chunk_index: int, segment_headers: Optional[dict] = None) -> str:
         """Generate a header for a segment.
 
-        Internal method to create segment headers.
+        Internal method to create segment headers. The header only uses the document title and
+        summary, which are the same for every chunk in a document, so if a segment_headers dict is
+        given it's used to look up each doc_id's header in the chunk DB only once.
         """
+        if segment_headers is not None and doc_id in segment_headers:
+            return segment_headers[doc_id]
         document_title = self.chunk_db.get_document_title(doc_id, chunk_index) or ""
         document_summary = self.chunk_db.get_document_summary(doc_id, chunk_index) or ""
-        return get_segment_header(
+        segment_header = get_segment_header(
             document_title=document_title, document_summary=document_summary
         )
+        if segment_headers is not None:
+            segment_headers[doc_id] = segment_header
+        return segment_header
 
     def _get_embeddings(self, text: list[str], input_type: str = "") -> list[Vector]:
         """Generate embeddings for text.
 
-        Internal method to interface with embedding model.
+        Internal method to interface with embedding model. Query embeddings are cached, so repeated
+        queries don't call the embedding model again; only the uncached queries are embedded.
         """
-        return self.embedding_model.get_embeddings(text, input_type)
+        if input_type != "query":
+            return self.embedding_model.get_embeddings(text, input_type)
+
+        now = time.monotonic()
+        embeddings = [None] * len(text)
+        with self._query_embedding_cache_lock:
+            for i, query in enumerate(text):
+                cached = self._query_embedding_cache.get(query)
+                if cached is not None and now - cached[1] < QUERY_EMBEDDING_CACHE_TTL:
+                    self._query_embedding_cache.move_to_end(query)
+                    embeddings[i] = cached[0]
+
+        missing = list(dict.fromkeys(query for query, embedding in zip(text, embeddings) if embedding is None))
+        if missing:
+            new_embeddings = dict(zip(missing, self.embedding_model.get_embeddings(missing, input_type)))
+            with self._query_embedding_cache_lock:
+                for query, embedding in new_embeddings.items():
+                    self._query_embedding_cache[query] = (embedding, now)
+                    self._query_embedding_cache.move_to_end(query)
+                while len(self._query_embedding_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                    self._query_embedding_cache.popitem(last=False)
+            embeddings = [new_embeddings[query] if embedding is None else embedding for query, embedding in zip(text, embeddings)]
+        return embeddings
+
+    def invalidate_query_cache(self) -> None:
+        """Clear the cached query embeddings.
+
+        Only needed if the embedding model's behaviour changes while the KnowledgeBase is in use.
+        """
+        with self._query_embedding_cache_lock:
+            self._query_embedding_cache.clear()
 
     def _cosine_similarity(self, v1, v2):
         """Calculate cosine similarity between vectors.
 
         Internal method for vector similarity calculation.
         """
-        return np.dot(v1, v2)
+        a = np.ascontiguousarray(v1, dtype=np.float32)
+        b = np.ascontiguousarray(v2, dtype=np.float32)
+        return float(np.vdot(a, b) / np.sqrt(np.vdot(a, a) * np.vdot(b, b) + 1e-12))
 
     def _search(self, query: str, top_k: int, metadata_filter: Optional[MetadataFilter] = None) -> list:
         """Search the knowledge base for relevant chunks.
@@ -746,6 +1077,13 @@ class KnowledgeBase:
         Internal method for single query search.
         """
         query_vector = self._get_embeddings([query], input_type="query")[0]
+        return self._search_with_vector(query, query_vector, top_k, metadata_filter)
+
+    def _search_with_vector(self, query: str, query_vector: Vector, top_k: int, metadata_filter: Optional[MetadataFilter] = None) -> list:
+        """Search the knowledge base with an already embedded query.
+
+        Internal method for single query search. The reranker still gets the query text.
+        """
         search_results = self.vector_db.search(query_vector, top_k, metadata_filter)
         if len(search_results) == 0:
             return []
@@ -755,14 +1093,23 @@ class KnowledgeBase:
     def _get_all_ranked_results(self, search_queries: list[str], metadata_filter: Optional[MetadataFilter] = None):
         """Execute multiple search queries.
 
-        Internal method for parallel query execution.
+        Internal method for parallel query execution. All the queries are embedded in one call,
+        then the searches and reranking run in parallel. The metadata filter is passed to the vector
+        DB, which applies it before taking the top SEARCH_TOP_K results.
         """
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            futures = [executor.submit(self._search, query, 200, metadata_filter) for query in search_queries]
-            all_ranked_results = []
-            for future in futures:
-                ranked_results = future.result()
-                all_ranked_results.append(ranked_results)
+        query_vectors = self._get_embeddings(search_queries, input_type="query")
+        if len(search_queries) == 1:
+            # nothing to overlap with, so skip the hand-off to the thread pool
+            return [self._search_with_vector(search_queries[0], query_vectors[0], SEARCH_TOP_K, metadata_filter)]
+        executor = _get_query_pool()
+        futures = [
+            executor.submit(self._search_with_vector, query, query_vector, SEARCH_TOP_K, metadata_filter)
+            for query, query_vector in zip(search_queries, query_vectors)
+        ]
+        all_ranked_results = []
+        for future in futures:
+            ranked_results = future.result()
+            all_ranked_results.append(ranked_results)
         return all_ranked_results
     
     def _get_segment_page_numbers(self, doc_id: str, chunk_start: int, chunk_end: int) -> tuple:
@@ -774,21 +1121,18 @@ class KnowledgeBase:
         _, end_page_number = self.chunk_db.get_chunk_page_numbers(doc_id, chunk_end - 1)
         return start_page_number, end_page_number
     
-    def _get_segment_content_from_database(self, doc_id: str, chunk_start: int, chunk_end: int, return_mode: str):
+    def _get_segment_content_from_database(self, doc_id: str, chunk_start: int, chunk_end: int, return_mode: str, segment_headers: Optional[dict] = None) -> tuple:
         """Retrieve segment content from database.
 
-        Internal method for content retrieval.
+        Internal method for content retrieval. Returns (content, start_page_number, end_page_number),
+        so the page numbers aren't looked up again. segment_headers is an optional per-query cache of
+        segment headers by doc_id (see _get_segment_header).
         """
         assert return_mode in ["text", "page_images", "dynamic"]
 
         if return_mode == "dynamic":
-            # loop through the chunks in the segment to see if any of them are visual
-            segment_is_visual = False
-            for chunk_index in range(chunk_start, chunk_end):
-                is_visual = self._get_is_visual(doc_id, chunk_index)
-                if is_visual:
-                    segment_is_visual = True
-                    break
+            # check whether any of the chunks in the segment are visual, with a single lookup
+            segment_is_visual = self.chunk_db.segment_has_visual(doc_id, chunk_start, chunk_end)
 
             # set the return mode based on whether the segment contains visual content or not
             if segment_is_visual:
@@ -797,19 +1141,49 @@ class KnowledgeBase:
                 return_mode = "text"
 
         if return_mode == "text":
-            segment_text = f"{self._get_segment_header(doc_id=doc_id, chunk_index=chunk_start)}\n\n"  # initialize the segment with the segment header
-            for chunk_index in range(chunk_start, chunk_end):
-                chunk_text = self._get_chunk_text(doc_id, chunk_index) or ""
-                segment_text += chunk_text
-            return segment_text.strip()
+            # the chunks' text comes from one range query rather than one query per chunk
+            chunk_rows = self.chunk_db.get_chunks_range(doc_id, chunk_start, chunk_end)
+            # the segment starts with the segment header, and is built with a single join
+            segment_header = self._get_segment_header(doc_id=doc_id, chunk_index=chunk_start, segment_headers=segment_headers)
+            segment_text = "".join([segment_header, "\n\n", *(row["chunk_text"] or "" for row in chunk_rows)]).strip()
+            # the rows already carry the page numbers that the segment starts and ends on
+            start_page_number = chunk_rows[0]["chunk_page_start"] if chunk_rows else None
+            end_page_number = chunk_rows[-1]["chunk_page_end"] if chunk_rows else None
+            return segment_text, start_page_number, end_page_number
         else:
             # get the page numbers that the segment starts and ends on
             start_page_number, end_page_number = self._get_segment_page_numbers(doc_id, chunk_start, chunk_end)
             page_image_paths = self.file_system.get_files(kb_id=self.kb_id, doc_id=doc_id, page_start=start_page_number, page_end=end_page_number)
             # If there are no page images, fallback to using text mode
             if page_image_paths == []:
-                page_image_paths = self._get_segment_content_from_database(doc_id, chunk_start, chunk_end, return_mode="text")
-            return page_image_paths
+                page_image_paths, _, _ = self._get_segment_content_from_database(doc_id, chunk_start, chunk_end, return_mode="text", segment_headers=segment_headers)
+            return page_image_paths, start_page_number, end_page_number
+
+    def _materialize_segment(self, segment_info: dict, return_mode: str, segment_headers: Optional[dict] = None) -> dict:
+        """Add the content and page numbers to a segment's info dict.
+
+        Internal method for content retrieval. Updates segment_info in place and returns it.
+        """
+        segment_info["content"], start_page_number, end_page_number = self._get_segment_content_from_database(
+            segment_info["doc_id"],
+            segment_info["chunk_start"],
+            segment_info["chunk_end"],
+            return_mode=return_mode,
+            segment_headers=segment_headers,
+        )
+        segment_info["segment_page_start"] = start_page_number
+        segment_info["segment_page_end"] = end_page_number
+
+        # Deprecated keys, but needed for backwards compatibility
+        segment_info["chunk_page_start"] = start_page_number
+        segment_info["chunk_page_end"] = end_page_number
+
+        # Backwards compatibility, where previously the content was stored in the "text" key
+        if type(segment_info["content"]) == str:
+            segment_info["text"] = segment_info["content"]
+        else:
+            segment_info["text"] = ""
+        return segment_info
 
     def query(
         self,
@@ -907,16 +1281,21 @@ class KnowledgeBase:
         # Start timing the overall query process
         overall_start_time = time.perf_counter()
 
+        # Debug payloads are only built when DEBUG is enabled, and the reranker's name is only looked up once
+        debug_enabled = query_logger.isEnabledFor(logging.DEBUG)
+        reranker_name = type(self.reranker).__name__ if debug_enabled else None
+
         try:
             # Log query parameters at DEBUG level
-            query_logger.debug("Query parameters", extra={
-                **base_extra,
-                "search_queries": search_queries,
-                "rse_params": rse_params if isinstance(rse_params, dict) else {"preset": rse_params},
-                "metadata_filter": metadata_filter,
-                "return_mode": return_mode,
-                "reranker_model": self.reranker.__class__.__name__
-            })
+            if debug_enabled:
+                query_logger.debug("Query parameters", extra={
+                    **base_extra,
+                    "search_queries": search_queries,
+                    "rse_params": rse_params if isinstance(rse_params, dict) else {"preset": rse_params},
+                    "metadata_filter": metadata_filter,
+                    "return_mode": return_mode,
+                    "reranker_model": reranker_name
+                })
             
             # check if the rse_params is a preset name and convert it to a dictionary if it is
             if isinstance(rse_params, str) and rse_params in RSE_PARAMS_PRESETS:
@@ -958,18 +1337,18 @@ class KnowledgeBase:
             all_ranked_results = self._get_all_ranked_results(search_queries=search_queries, metadata_filter=metadata_filter)
             step_duration = time.perf_counter() - step_start_time
             
-            # Get the number of initial results per query
-            initial_results_per_query = [len(results) for results in all_ranked_results]
-            
             # Log information about search/rerank step
-            query_logger.debug("Search/Rerank complete", extra={
-                **base_extra, 
-                "step": "search_rerank", 
-                "duration_s": round(step_duration, 4),
-                "num_initial_results_per_query": initial_results_per_query,
-                "total_initial_results": sum(initial_results_per_query),
-                "reranker": self.reranker.__class__.__name__
-            })
+            if debug_enabled:
+                # Get the number of initial results per query
+                initial_results_per_query = [len(results) for results in all_ranked_results]
+                query_logger.debug("Search/Rerank complete", extra={
+                    **base_extra, 
+                    "step": "search_rerank", 
+                    "duration_s": round(step_duration, 4),
+                    "num_initial_results_per_query": initial_results_per_query,
+                    "total_initial_results": sum(initial_results_per_query),
+                    "reranker": reranker_name
+                })
             
             if latency_profiling:
                 print(
@@ -1011,71 +1390,49 @@ class KnowledgeBase:
             step_duration = time.perf_counter() - step_start_time
             
             # Log information about RSE step
-            query_logger.debug("RSE complete", extra={
-                **base_extra,
-                "step": "rse", 
-                "duration_s": round(step_duration, 4),
-                "num_final_segments": len(best_segments),
-                "segment_scores": [round(s, 4) for s in scores]
-            })
+            if debug_enabled:
+                query_logger.debug("RSE complete", extra={
+                    **base_extra,
+                    "step": "rse", 
+                    "duration_s": round(step_duration, 4),
+                    "num_final_segments": len(best_segments),
+                    "segment_scores": [round(s, 4) for s in scores]
+                })
 
             # --- Content Retrieval Step ---
             step_start_time = time.perf_counter()
             
             # convert the best segments into a list of dictionaries that contain the document id and the start and end of the chunk
-            relevant_segment_info = []
-            for segment_index, (start, end) in enumerate(best_segments):
-                # find the document that this segment starts in
-                for i, split in enumerate(document_splits):
-                    if start < split:  # splits represent the end of each document
-                        doc_start = document_splits[i - 1] if i > 0 else 0
-                        relevant_segment_info.append(
-                            {
-                                "doc_id": unique_document_ids[i],
-                                "chunk_start": start - doc_start,
-                                "chunk_end": end - doc_start,
-                            }
-                        )  # NOTE: end index is non-inclusive
-                        break
-
-                score = scores[segment_index]
-                relevant_segment_info[-1]["score"] = score
-
-            # retrieve the content for each of the segments
-            for segment_info in relevant_segment_info:
-                segment_info["content"] = self._get_segment_content_from_database(
-                    segment_info["doc_id"],
-                    segment_info["chunk_start"],
-                    segment_info["chunk_end"],
-                    return_mode=return_mode,
-                )
-                start_page_number, end_page_number = self._get_segment_page_numbers(
-                    segment_info["doc_id"],
-                    segment_info["chunk_start"],
-                    segment_info["chunk_end"]
-                )
-                segment_info["segment_page_start"] = start_page_number
-                segment_info["segment_page_end"] = end_page_number
-
-                # Deprecated keys, but needed for backwards compatibility
-                segment_info["chunk_page_start"] = start_page_number
-                segment_info["chunk_page_end"] = end_page_number
-
-                # Backwards compatibility, where previously the content was stored in the "text" key
-                if type(segment_info["content"]) == str:
-                    segment_info["text"] = segment_info["content"]
-                else:
-                    segment_info["text"] = ""
-            
+            relevant_segment_info = get_relevant_segment_info(
+                best_segments=best_segments,
+                scores=scores,
+                document_splits=document_splits,
+                document_start_points=document_start_points,
+                unique_document_ids=unique_document_ids,
+            )
+
+            # retrieve the content for each of the segments. The lookups are I/O-bound and independent, so
+            # the segments are retrieved concurrently. Segments from the same document share a segment
+            # header, so it's only looked up once per document (at most once per thread in a race).
+            segment_headers = {}
+            if len(relevant_segment_info) == 1:
+                # a single segment is retrieved inline, without the hand-off to the thread pool
+                self._materialize_segment(relevant_segment_info[0], return_mode, segment_headers)
+            else:
+                list(_get_query_pool().map(
+                    lambda segment_info: self._materialize_segment(segment_info, return_mode, segment_headers),
+                    relevant_segment_info
+                ))
             step_duration = time.perf_counter() - step_start_time
             
             # Log information about content retrieval step
-            query_logger.debug("Content retrieval complete", extra={
-                **base_extra, 
-                "step": "content_retrieval", 
-                "duration_s": round(step_duration, 4),
-                "return_mode": return_mode
-            })
+            if debug_enabled:
+                query_logger.debug("Content retrieval complete", extra={
+                    **base_extra, 
+                    "step": "content_retrieval", 
+                    "duration_s": round(step_duration, 4),
+                    "return_mode": return_mode
+                })
             
             # Calculate and log overall query duration
             overall_duration = time.perf_counter() - overall_start_time
@@ -1100,4 +1457,28 @@ class KnowledgeBase:
                 exc_info=True
             )
             # Re-raise the exception
-            raise
\ No newline at end of file
+            raise
+
+    async def aquery(
+        self,
+        search_queries: list[str],
+        rse_params: Union[Dict, str] = "balanced",
+        latency_profiling: bool = False,
+        metadata_filter: Optional[MetadataFilter] = None,
+        return_mode: str = "text",
+    ) -> list[dict]:
+        """Async version of query. See query for the arguments and return value.
+
+        The query runs in a thread via asyncio.to_thread, so it doesn't block the event loop. Within
+        it, the searches and reranking for each search query already run concurrently on the shared
+        query thread pool, so the embedding, vector DB and reranker calls for different search
+        queries overlap.
+        """
+        return await asyncio.to_thread(
+            self.query,
+            search_queries=search_queries,
+            rse_params=rse_params,
+            latency_profiling=latency_profiling,
+            metadata_filter=metadata_filter,
+            return_mode=return_mode,
+        )
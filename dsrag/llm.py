@@ -37,14 +37,20 @@ class OpenAIChatAPI(LLM):
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self._client = None
+
+    def _get_client(self) -> "openai.OpenAI":
+        # Created on first use and then reused, so every call shares the same connection pool
+        if self._client is None:
+            base_url = os.environ.get("DSRAG_OPENAI_BASE_URL", None)
+            if base_url is not None:
+                self._client = openai.OpenAI(api_key=os.environ["OPENAI_API_KEY"], base_url=base_url)
+            else:
+                self._client = openai.OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+        return self._client
 
     def make_llm_call(self, chat_messages: list[dict]) -> str:
-        base_url = os.environ.get("DSRAG_OPENAI_BASE_URL", None)
-        if base_url is not None:
-            client = openai.OpenAI(api_key=os.environ["OPENAI_API_KEY"], base_url=base_url)
-        else:
-            client = openai.OpenAI(api_key=os.environ["OPENAI_API_KEY"])
-        response = client.chat.completions.create(
+        response = self._get_client().chat.completions.create(
             model=self.model,
             messages=chat_messages,
             max_tokens=self.max_tokens,
@@ -67,13 +73,19 @@ class AnthropicChatAPI(LLM):
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self._client = None
+
+    def _get_client(self) -> "anthropic.Anthropic":
+        # Created on first use and then reused, so every call shares the same connection pool
+        if self._client is None:
+            base_url = os.environ.get("DSRAG_ANTHROPIC_BASE_URL", None)
+            if base_url is not None:
+                self._client = anthropic.Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"], base_url=base_url)
+            else:
+                self._client = anthropic.Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"])
+        return self._client
 
     def make_llm_call(self, chat_messages: list[dict]) -> str:
-        base_url = os.environ.get("DSRAG_ANTHROPIC_BASE_URL", None)
-        if base_url is not None:
-            client = anthropic.Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"], base_url=base_url)
-        else:
-            client = anthropic.Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"])
         system_message = ""
         num_system_messages = 0
         normal_chat_messages = []
@@ -86,7 +98,7 @@ class AnthropicChatAPI(LLM):
             else:
                 normal_chat_messages.append(message)
 
-        message = client.messages.create(
+        message = self._get_client().messages.create(
             system=system_message,
             messages=normal_chat_messages,
             model=self.model,
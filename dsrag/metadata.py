@@ -4,7 +4,7 @@ from decimal import Decimal
 import json
 from typing import Any
 from abc import ABC, abstractmethod
-from dsrag.utils.imports import boto3
+from dsrag.utils.imports import boto3, orjson
 
 class MetadataStorage(ABC):
 
@@ -28,9 +28,10 @@ class LocalMetadataStorage(MetadataStorage):
     def __init__(self, storage_directory: str) -> None:
         super().__init__()
         self.storage_directory = storage_directory
+        self.metadata_dir = os.path.join(self.storage_directory, "metadata")
 
     def get_metadata_path(self, kb_id: str) -> str:
-        return os.path.join(self.storage_directory, "metadata", f"{kb_id}.json")
+        return os.path.join(self.metadata_dir, f"{kb_id}.json")
 
     def kb_exists(self, kb_id: str) -> bool:
         metadata_path = self.get_metadata_path(kb_id)
@@ -38,18 +39,29 @@ class LocalMetadataStorage(MetadataStorage):
     
     def load(self, kb_id: str) -> dict:
         metadata_path = self.get_metadata_path(kb_id)
-        with open(metadata_path, "r") as f:
+        # orjson is optional - fall back to the standard library json module if it isn't installed.
+        # Both write the same format: UTF-8 JSON indented by two spaces.
+        if orjson.is_available():
+            with open(metadata_path, "rb") as f:
+                return orjson.loads(f.read())
+        with open(metadata_path, "r", encoding="utf-8") as f:
             data = json.load(f)
         return data
 
     def save(self, full_data: dict, kb_id: str):
         metadata_path = self.get_metadata_path(kb_id)
-        metadata_dir = os.path.join(self.storage_directory, "metadata")
-        if not os.path.exists(metadata_dir):
-            os.makedirs(metadata_dir)
-
-        with open(metadata_path, "w") as f:
-            json.dump(full_data, f, indent=4)
+        if not os.path.exists(self.metadata_dir):
+            os.makedirs(self.metadata_dir)
+
+        if orjson.is_available():
+            with open(metadata_path, "wb") as f:
+                f.write(orjson.dumps(
+                    full_data,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+                ))
+            return
+        with open(metadata_path, "w", encoding="utf-8") as f:
+            json.dump(full_data, f, indent=2, ensure_ascii=False)
 
     def delete(self, kb_id: str):
         metadata_path = self.get_metadata_path(kb_id)
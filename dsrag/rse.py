@@ -1,3 +1,4 @@
+import bisect
 import numpy as np
 
 def get_best_segments(all_relevance_values: list[list], document_splits: list[int], max_length: int, overall_max_length: int, minimum_value: float):
@@ -75,20 +76,43 @@ def get_meta_document(all_ranked_results: list[list], top_k_for_document_selecti
         top_document_ids.extend([result["metadata"]["doc_id"] for result in ranked_results[:top_k_for_document_selection]]) # get document IDs for top results for each query
     unique_document_ids = list(set(top_document_ids)) # get the unique document IDs for the top results across all queries
 
-    # get the max chunk index for each document and use this to get the document splits and document start points for the meta-document (i.e. the concatenation of all the documents)
+    # get the max chunk index for each document, in a single pass over the results
+    max_chunk_indices = dict.fromkeys(unique_document_ids, -1)
+    for ranked_results in all_ranked_results:
+        for result in ranked_results:
+            document_id = result["metadata"]["doc_id"]
+            if document_id in max_chunk_indices:
+                max_chunk_indices[document_id] = max(max_chunk_indices[document_id], result["metadata"]["chunk_index"])
+
+    # use the max chunk indices to get the document splits and document start points for the meta-document (i.e. the concatenation of all the documents)
     document_splits = [] # indices that represent the (non-inclusive) end of each document in the meta-document
     document_start_points = {} # index of the first chunk of each document in the meta-document, keyed on document_id
     for document_id in unique_document_ids:
-        max_chunk_index = -1
-        for ranked_results in all_ranked_results:
-            for result in ranked_results:
-                if result["metadata"]["doc_id"] == document_id:
-                    max_chunk_index = max(max_chunk_index, result["metadata"]["chunk_index"])
+        max_chunk_index = max_chunk_indices[document_id]
         document_start_points[document_id] = document_splits[-1] if document_splits else 0
         document_splits.append(int(max_chunk_index + document_splits[-1] + 1 if document_splits else max_chunk_index + 1)) # basically the start point of the next document
 
     return document_splits, document_start_points, unique_document_ids
 
+def get_relevant_segment_info(best_segments: list[tuple[int, int]], scores: list[float], document_splits: list[int], document_start_points: dict[str, int], unique_document_ids: list[str]) -> list[dict]:
+    """
+    Convert the best segments from meta-document indices to the document they're in and their chunk indices within it.
+
+    Returns a list of dicts with the doc_id, chunk_start, chunk_end (non-inclusive) and score of each segment.
+    """
+    # find the document that each segment starts in - the splits represent the end of each
+    # document and are sorted, so it's the first split greater than the segment's start
+    segment_doc_ids = [unique_document_ids[bisect.bisect_right(document_splits, start)] for start, _ in best_segments]
+    return [
+        {
+            "doc_id": doc_id,
+            "chunk_start": start - document_start_points[doc_id],
+            "chunk_end": end - document_start_points[doc_id],  # NOTE: end index is non-inclusive
+            "score": score,
+        }
+        for (start, end), score, doc_id in zip(best_segments, scores, segment_doc_ids)
+    ]
+
 # define the value of a given rank
 def get_chunk_value(chunk_info: dict, irrelevant_chunk_penalty: float, decay_rate: int):
     """
@@ -108,28 +132,38 @@ def get_chunk_value(chunk_info: dict, irrelevant_chunk_penalty: float, decay_rat
 
 def get_relevance_values(all_ranked_results: list[list], meta_document_length: int, document_start_points: dict[str, int], unique_document_ids: list[str], irrelevant_chunk_penalty: float, decay_rate: int = 20, chunk_length_adjustment = True):
     # get the relevance values for each chunk in the meta-document, separately for each query
+    unique_document_ids = set(unique_document_ids)
     all_relevance_values = []
     for ranked_results in all_ranked_results:
-        
-        # loop through the top results for each query and add their rank to the relevance ranks list
-        all_chunk_info = [{} for _ in range(meta_document_length)]
+
+        # loop through the top results for each query and collect the rank, similarity and length of each chunk
+        # in the meta-document - if a chunk appears more than once, its last result wins
+        all_chunk_info = {}
         for rank, result in enumerate(ranked_results):
-            document_id = result["metadata"]["doc_id"]
+            metadata = result["metadata"]
+            document_id = metadata["doc_id"]
             if document_id not in unique_document_ids:
                 continue
-            
-            chunk_index = int(result["metadata"]["chunk_index"])
-            meta_document_index = int(document_start_points[document_id] + chunk_index) # find the correct index for this chunk in the meta-document
-            absolute_relevance_value = result["similarity"]
-            chunk_length = len(result["metadata"]["chunk_text"]) # get the length of the chunk in characters
-            all_chunk_info[meta_document_index] = {'rank': rank, 'absolute_relevance_value': absolute_relevance_value, 'chunk_length': chunk_length}
 
-        # convert the relevance ranks and other info to chunk values
-        relevance_values = [get_chunk_value(chunk_info, irrelevant_chunk_penalty, decay_rate) for chunk_info in all_chunk_info]
+            meta_document_index = int(document_start_points[document_id] + int(metadata["chunk_index"])) # find the correct index for this chunk in the meta-document
+            all_chunk_info[meta_document_index] = (rank, result["similarity"], len(metadata["chunk_text"]))
+
+        # fill arrays over the whole meta-document, using the same defaults as get_chunk_value for chunks without a result
+        ranks = np.full(meta_document_length, 1000.0)
+        absolute_relevance_values = np.zeros(meta_document_length)
+        chunk_lengths = np.zeros(meta_document_length)
+        if all_chunk_info:
+            indices = np.fromiter(all_chunk_info.keys(), dtype=np.int64, count=len(all_chunk_info))
+            chunk_info = np.array(list(all_chunk_info.values()), dtype=np.float64)
+            ranks[indices] = chunk_info[:, 0]
+            absolute_relevance_values[indices] = chunk_info[:, 1]
+            chunk_lengths[indices] = chunk_info[:, 2]
+
+        # convert the relevance ranks and other info to chunk values (see get_chunk_value)
+        relevance_values = list(np.exp(-ranks / decay_rate) * absolute_relevance_values - irrelevant_chunk_penalty)
 
         if chunk_length_adjustment:
             # adjust the relevance values for the length of the chunks
-            chunk_lengths = [chunk_info.get('chunk_length', 0.0) for chunk_info in all_chunk_info]
             relevance_values = adjust_relevance_values_for_chunk_length(relevance_values, chunk_lengths)
 
         all_relevance_values.append(relevance_values)
@@ -142,11 +176,8 @@ def adjust_relevance_values_for_chunk_length(relevance_values: list[float], chun
     - reference_length is the length of a standard chunk, measured in number of characters (default is 700 characters, because this is the average length of a chunk when you set the max to 800, which is the default.)
     """
     assert len(relevance_values) == len(chunk_lengths), "The length of relevance_values and chunk_lengths must be the same"
-    adjusted_relevance_values = []
-    for relevance_value, chunk_length in zip(relevance_values, chunk_lengths):
-        bounded_chunk_length = max(chunk_length, reference_length) # only adjust relevance values for chunks that are longer than the reference length
-        adjusted_relevance_values.append(relevance_value * (bounded_chunk_length / reference_length))
-    return adjusted_relevance_values
+    bounded_chunk_lengths = np.maximum(np.asarray(chunk_lengths, dtype=np.float64), reference_length) # only adjust relevance values for chunks that are longer than the reference length
+    return list(np.asarray(relevance_values, dtype=np.float64) * (bounded_chunk_lengths / reference_length))
 
 RSE_PARAMS_PRESETS = {
     "balanced": {
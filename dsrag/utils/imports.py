@@ -2,6 +2,7 @@
 Utilities for lazy imports of optional dependencies.
 """
 import importlib
+import importlib.util
 
 class LazyLoader:
     """
@@ -29,6 +30,13 @@ class LazyLoader:
         self._module_name = module_name
         self._package_name = package_name or module_name
         self._module = None
+        self._available = None
+
+    def is_available(self) -> bool:
+        """Whether the module is installed, checked without importing it. The result is cached."""
+        if self._available is None:
+            self._available = self._module is not None or importlib.util.find_spec(self._module_name) is not None
+        return self._available
     
     def __getattr__(self, name):
         """Called when an attribute is accessed."""
@@ -72,4 +80,5 @@ genai_new = LazyLoader("google.genai", "google-genai")
 boto3 = LazyLoader("boto3")
 faiss = LazyLoader("faiss", "faiss-cpu")
 psycopg2 = LazyLoader("psycopg2", "psycopg2-binary")
-pgvector = LazyLoader("pgvector")
\ No newline at end of file
+pgvector = LazyLoader("pgvector")
+orjson = LazyLoader("orjson")
\ No newline at end of file
@@ -0,0 +1,313 @@
+import os
+import sys
+import time
+import shutil
+import asyncio
+import threading
+import unittest
+import numpy as np
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from dsrag.add_document import auto_context, call_with_retry
+from dsrag.embedding import Embedding
+from dsrag.knowledge_base import KnowledgeBase
+from dsrag.llm import LLM
+from dsrag.reranker import NoReranker
+
+
+class CountingEmbedding(Embedding):
+    """Deterministic embedding that records the size of every call"""
+    def __init__(self, dimension: int = 4):
+        super().__init__(dimension)
+        self.call_sizes = []
+
+    def get_embeddings(self, text, input_type=None):
+        self.call_sizes.append(len(text))
+        return [[float(len(t)), 1.0, 0.0, 0.0] for t in text]
+
+
+class UnusedLLM(LLM):
+    """AutoContext model for tests that never make LLM calls"""
+    def make_llm_call(self, chat_messages):
+        raise AssertionError("unexpected LLM call")
+
+
+class ConcurrentLLM(LLM):
+    """Slow LLM that records how many calls are in flight at once"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def make_llm_call(self, chat_messages):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05)
+        with self.lock:
+            self.in_flight -= 1
+        return "summary"
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class TestCallWithRetry(unittest.TestCase):
+    def test__transient_errors_are_retried(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise RateLimitError("slow down")
+            return "ok"
+
+        with patch("dsrag.add_document.time.sleep") as mock_sleep:
+            self.assertEqual(call_with_retry(flaky), "ok")
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test__other_errors_are_raised_immediately(self):
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise ValueError("bad request")
+
+        with patch("dsrag.add_document.time.sleep") as mock_sleep:
+            with self.assertRaises(ValueError):
+                call_with_retry(broken)
+        self.assertEqual(len(calls), 1)
+        mock_sleep.assert_not_called()
+
+    def test__transient_error_is_raised_after_the_last_attempt(self):
+        def always_rate_limited():
+            raise RateLimitError("slow down")
+
+        with patch("dsrag.add_document.time.sleep") as mock_sleep:
+            with self.assertRaises(RateLimitError):
+                call_with_retry(always_rate_limited, max_retries=2)
+        self.assertEqual(mock_sleep.call_count, 1)
+
+
+class TestAddDocuments(unittest.TestCase):
+    def setUp(self):
+        self.storage_directory = "~/test__add_documents_dsRAG"
+        resolved_test_storage_directory = os.path.expanduser(self.storage_directory)
+        if os.path.exists(resolved_test_storage_directory):
+            shutil.rmtree(resolved_test_storage_directory)
+
+        self.embedding_model = CountingEmbedding()
+        self.kb = KnowledgeBase(
+            kb_id="test_kb",
+            storage_directory=self.storage_directory,
+            embedding_model=self.embedding_model,
+            reranker=NoReranker(),
+            auto_context_model=UnusedLLM(),
+            save_metadata_to_disk=False,
+        )
+        # no LLM calls: no semantic sectioning, no generated title or summary
+        self.documents = [
+            {
+                "doc_id": f"doc_{i}",
+                "text": f"Document {i}. " + "Some sentence about the topic. " * 20,
+                "auto_context_config": {"use_generated_title": False, "get_document_summary": False},
+                "semantic_sectioning_config": {"use_semantic_sectioning": False},
+                "chunking_config": {"chunk_size": 200, "min_length_for_chunking": 100},
+            }
+            for i in range(5)
+        ]
+        return super().setUp()
+
+    def tearDown(self):
+        resolved_test_storage_directory = os.path.expanduser(self.storage_directory)
+        if os.path.exists(resolved_test_storage_directory):
+            shutil.rmtree(resolved_test_storage_directory)
+        return super().tearDown()
+
+    def test__documents_are_embedded_in_one_batch(self):
+        uploaded = self.kb.add_documents(self.documents, show_progress=False, rate_limit_pause=0)
+
+        self.assertEqual(sorted(uploaded), [doc["doc_id"] for doc in self.documents])
+        # a single embedding call covers the chunks of every document
+        self.assertEqual(len(self.embedding_model.call_sizes), 1)
+        num_vectors = len(self.kb.vector_db.vectors)
+        self.assertEqual(self.embedding_model.call_sizes[0], num_vectors)
+        self.assertEqual(self.kb.vector_db.vectors[0].dtype, np.float32)
+
+        # every document's chunks and vectors line up with each other
+        for doc in self.documents:
+            doc_id = doc["doc_id"]
+            vector_metadata = [m for m in self.kb.vector_db.metadata if m["doc_id"] == doc_id]
+            self.assertGreater(len(vector_metadata), 1)
+            for m in vector_metadata:
+                self.assertEqual(self.kb.chunk_db.get_chunk_text(doc_id, m["chunk_index"]), m["chunk_text"])
+
+    def test__small_batch_size_flushes_per_document(self):
+        self.kb.add_documents(self.documents, show_progress=False, rate_limit_pause=0, batch_size=1)
+        self.assertEqual(len(self.embedding_model.call_sizes), len(self.documents))
+        self.assertEqual(sorted(self.kb.chunk_db.get_all_doc_ids()), [doc["doc_id"] for doc in self.documents])
+
+    def test__existing_and_duplicate_documents_are_skipped(self):
+        self.kb.add_document(**self.documents[0])
+        num_vectors = len(self.kb.vector_db.vectors)
+
+        uploaded = self.kb.add_documents(
+            [self.documents[0], self.documents[1], self.documents[1]], show_progress=False, rate_limit_pause=0
+        )
+        self.assertEqual(sorted(uploaded), ["doc_0", "doc_1"])
+        self.assertEqual(sorted(self.kb.chunk_db.get_all_doc_ids()), ["doc_0", "doc_1"])
+        self.assertEqual(len(self.kb.vector_db.vectors), 2 * num_vectors)
+
+    def test__existing_and_invalid_documents_are_not_parsed(self):
+        self.kb.add_document(**self.documents[0])
+        with patch("dsrag.knowledge_base.parse_and_chunk") as mock_parse_and_chunk:
+            self.kb.add_document(**self.documents[0])
+            with self.assertRaises(ValueError):
+                self.kb.add_document(**{**self.documents[1], "doc_id": "folder/doc_1"})
+            mock_parse_and_chunk.assert_not_called()
+
+    def test__failed_embedding_only_drops_the_bad_document(self):
+        get_embeddings = self.embedding_model.get_embeddings
+
+        def failing_get_embeddings(text, input_type=None):
+            if any("Document 2." in t for t in text):
+                raise ValueError("bad document")
+            return get_embeddings(text, input_type)
+
+        self.embedding_model.get_embeddings = failing_get_embeddings
+        uploaded = self.kb.add_documents(self.documents, show_progress=False, rate_limit_pause=0)
+
+        expected_doc_ids = ["doc_0", "doc_1", "doc_3", "doc_4"]
+        self.assertEqual(sorted(uploaded), expected_doc_ids)
+        self.assertEqual(sorted(self.kb.chunk_db.get_all_doc_ids()), expected_doc_ids)
+        self.assertEqual(sorted(set(m["doc_id"] for m in self.kb.vector_db.metadata)), expected_doc_ids)
+
+    def test__failed_vector_write_leaves_nothing_half_written(self):
+        add_vectors = self.kb.vector_db.add_vectors
+
+        def failing_add_vectors(vectors, metadata):
+            if any(m["doc_id"] == "doc_2" for m in metadata):
+                raise ValueError("bad document")
+            return add_vectors(vectors, metadata)
+
+        self.kb.vector_db.add_vectors = failing_add_vectors
+        uploaded = self.kb.add_documents(self.documents, show_progress=False, rate_limit_pause=0)
+
+        expected_doc_ids = ["doc_0", "doc_1", "doc_3", "doc_4"]
+        self.assertEqual(sorted(uploaded), expected_doc_ids)
+        # the failed document has neither chunk rows nor vectors, so a re-run will add it
+        self.assertEqual(sorted(self.kb.chunk_db.get_all_doc_ids()), expected_doc_ids)
+        self.assertEqual(sorted(set(m["doc_id"] for m in self.kb.vector_db.metadata)), expected_doc_ids)
+
+        self.kb.vector_db.add_vectors = add_vectors
+        self.assertEqual(sorted(self.kb.add_documents(self.documents, show_progress=False, rate_limit_pause=0)), [doc["doc_id"] for doc in self.documents])
+        self.assertIn("doc_2", set(m["doc_id"] for m in self.kb.vector_db.metadata))
+
+    def test__failed_chunk_write_removes_the_vectors(self):
+        def failing_add_document(*args, **kwargs):
+            raise ValueError("chunk db down")
+
+        self.kb.chunk_db.add_document = failing_add_document
+        uploaded = self.kb.add_documents(self.documents[:2], show_progress=False, rate_limit_pause=0)
+        self.assertEqual(uploaded, [])
+        self.assertEqual(self.kb.vector_db.metadata, [])
+
+    def test__existing_doc_ids_are_read_once(self):
+        get_all_doc_ids = self.kb.chunk_db.get_all_doc_ids
+        calls = []
+        self.kb.chunk_db.get_all_doc_ids = lambda *args, **kwargs: calls.append(1) or get_all_doc_ids(*args, **kwargs)
+
+        self.kb.add_documents(self.documents, show_progress=False, rate_limit_pause=0)
+        self.assertEqual(len(calls), 1)
+
+    def test__kb_config_is_saved_once(self):
+        save = self.kb.metadata_storage.save
+        calls = []
+        self.kb.metadata_storage.save = lambda *args, **kwargs: calls.append(1) or save(*args, **kwargs)
+
+        self.kb.add_documents(self.documents, show_progress=False, rate_limit_pause=0, batch_size=1)
+        self.assertEqual(len(calls), 1)
+
+    def test__configs_are_not_modified(self):
+        doc = self.documents[0]
+        chunking_config = dict(doc["chunking_config"])
+        self.kb.add_document(**doc, chunk_size=300, min_length_for_chunking=50)
+        self.assertEqual(doc["chunking_config"], chunking_config)
+
+    def test__aadd_documents_bounds_concurrency(self):
+        in_flight = {"current": 0, "max": 0}
+        lock = threading.Lock()
+        all_in_flight = threading.Event()
+
+        def slow_prepare_document(**kwargs):
+            with lock:
+                in_flight["current"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["current"])
+                if in_flight["current"] == in_flight["target"]:
+                    all_in_flight.set()
+            # hold each document until max_workers of them are in flight (or give up, if they can't be)
+            all_in_flight.wait(timeout=5)
+            with lock:
+                in_flight["current"] -= 1
+            return KnowledgeBase._prepare_document(self.kb, **kwargs)
+
+        # more workers than the event loop's default executor has threads
+        default_executor_threads = min(32, (os.cpu_count() or 1) + 4)
+        for max_workers in [2, default_executor_threads + 4]:
+            self.setUp()
+            self.kb._prepare_document = slow_prepare_document
+            in_flight.update(current=0, max=0, target=max_workers)
+            all_in_flight.clear()
+            documents = [{**self.documents[0], "doc_id": f"doc_{i:03d}"} for i in range(max_workers + 3)]
+
+            uploaded = asyncio.run(
+                self.kb.aadd_documents(documents, max_workers=max_workers, show_progress=False, rate_limit_pause=0)
+            )
+            self.assertEqual(sorted(uploaded), [doc["doc_id"] for doc in documents])
+            self.assertEqual(in_flight["max"], max_workers)
+
+            # vectors are written in (doc_id, chunk_index) order, whatever order documents finished in
+            keys = [(m["doc_id"], m["chunk_index"]) for m in self.kb.vector_db.metadata]
+            self.assertEqual(keys, sorted(keys))
+
+    def test__parsing_in_worker_processes(self):
+        uploaded = self.kb.add_documents(self.documents, max_workers=2, show_progress=False, rate_limit_pause=0, cpu_workers=2)
+        self.assertEqual(sorted(uploaded), [doc["doc_id"] for doc in self.documents])
+        self.assertEqual(sorted(self.kb.chunk_db.get_all_doc_ids()), [doc["doc_id"] for doc in self.documents])
+        self.assertEqual(len(self.embedding_model.call_sizes), 1)
+
+    def test__add_documents_inside_running_event_loop(self):
+        async def add_from_coroutine():
+            return self.kb.add_documents(self.documents, show_progress=False, rate_limit_pause=0)
+
+        uploaded = asyncio.run(add_from_coroutine())
+        self.assertEqual(sorted(uploaded), [doc["doc_id"] for doc in self.documents])
+
+    def test__document_summary_runs_alongside_section_summaries(self):
+        llm = ConcurrentLLM()
+        sections = [{"title": "Section", "content": "Some section text."}]
+        chunks = [{"content": "Some section text.", "section_index": 0}]
+        # truncation needs the tiktoken encoding, which isn't relevant here
+        with patch("dsrag.auto_context.truncate_content", side_effect=lambda text, max_tokens: (text, 0)):
+            chunks, chunks_to_embed = auto_context(
+                kb_id="test_kb",
+                auto_context_model=llm,
+                sections=sections,
+                chunks=chunks,
+                text="Some section text.",
+                doc_id="doc_0",
+                document_title="Title",
+                auto_context_config={"get_section_summaries": True, "llm_max_concurrent_requests": 2},
+                language="en",
+            )
+        self.assertEqual(llm.max_in_flight, 2)
+        self.assertEqual(chunks[0]["document_summary"], "summary")
+        self.assertEqual(chunks[0]["section_summary"], "summary")
+
+
+if __name__ == "__main__":
+    unittest.main()
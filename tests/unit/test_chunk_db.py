@@ -121,6 +121,38 @@ class TestChunkDB(unittest.TestCase):
         summary = db.get_section_summary(doc_id, 0)
         self.assertEqual(summary, "Summary 1")
 
+    def test__get_chunks_range(self):
+        db = BasicChunkDB(self.kb_id, self.storage_directory)
+        chunks = {
+            i: {
+                "chunk_text": f"Content of chunk {i}",
+                "is_visual": i == 2,
+                "chunk_page_start": i + 1,
+                "chunk_page_end": i + 2,
+            }
+            for i in range(4)
+        }
+        db.add_document("doc1", chunks)
+
+        rows = db.get_chunks_range("doc1", 1, 3)
+        self.assertEqual([row["chunk_index"] for row in rows], [1, 2])
+        self.assertEqual([row["chunk_text"] for row in rows], ["Content of chunk 1", "Content of chunk 2"])
+        self.assertEqual([bool(row["is_visual"]) for row in rows], [False, True])
+        self.assertEqual([(row["chunk_page_start"], row["chunk_page_end"]) for row in rows], [(2, 3), (3, 4)])
+        # chunks past the end of the document are left out
+        self.assertEqual(len(db.get_chunks_range("doc1", 3, 10)), 1)
+        self.assertEqual(db.get_chunks_range("missing_doc", 0, 2), [])
+
+    def test__segment_has_visual(self):
+        db = BasicChunkDB(self.kb_id, self.storage_directory)
+        chunks = {i: {"chunk_text": f"Content of chunk {i}", "is_visual": i == 2} for i in range(4)}
+        db.add_document("doc1", chunks)
+
+        self.assertTrue(db.segment_has_visual("doc1", 1, 3))
+        self.assertFalse(db.segment_has_visual("doc1", 0, 2))
+        self.assertFalse(db.segment_has_visual("doc1", 3, 10))
+        self.assertFalse(db.segment_has_visual("missing_doc", 0, 4))
+
     def test__remove_document(self):
         db = BasicChunkDB(self.kb_id, self.storage_directory)
         doc_id = "doc1"
@@ -299,6 +331,38 @@ class TestSQLiteDB(unittest.TestCase):
         # There should only be one document with the supp_id 'Supp ID 1'
         self.assertEqual(len(docs), 1)
 
+    def test__get_chunks_range(self):
+        db = SQLiteDB(self.kb_id, self.storage_directory)
+        chunks = {
+            i: {
+                "chunk_text": f"Content of chunk {i}",
+                "is_visual": i == 2,
+                "chunk_page_start": i + 1,
+                "chunk_page_end": i + 2,
+            }
+            for i in range(4)
+        }
+        db.add_document("doc1", chunks)
+
+        rows = db.get_chunks_range("doc1", 1, 3)
+        self.assertEqual([row["chunk_index"] for row in rows], [1, 2])
+        self.assertEqual([row["chunk_text"] for row in rows], ["Content of chunk 1", "Content of chunk 2"])
+        self.assertEqual([bool(row["is_visual"]) for row in rows], [False, True])
+        self.assertEqual([(row["chunk_page_start"], row["chunk_page_end"]) for row in rows], [(2, 3), (3, 4)])
+        # chunks past the end of the document are left out
+        self.assertEqual(len(db.get_chunks_range("doc1", 3, 10)), 1)
+        self.assertEqual(db.get_chunks_range("missing_doc", 0, 2), [])
+
+    def test__segment_has_visual(self):
+        db = SQLiteDB(self.kb_id, self.storage_directory)
+        chunks = {i: {"chunk_text": f"Content of chunk {i}", "is_visual": i == 2} for i in range(4)}
+        db.add_document("doc1", chunks)
+
+        self.assertTrue(db.segment_has_visual("doc1", 1, 3))
+        self.assertFalse(db.segment_has_visual("doc1", 0, 2))
+        self.assertFalse(db.segment_has_visual("doc1", 3, 10))
+        self.assertFalse(db.segment_has_visual("missing_doc", 0, 4))
+
     def test__remove_document(self):
         db = SQLiteDB(self.kb_id, self.storage_directory)
         doc_id = "doc1"
@@ -1,6 +1,7 @@
 import os
 import sys
 import unittest
+from unittest.mock import patch, MagicMock
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 from dsrag.llm import OpenAIChatAPI, AnthropicChatAPI, OllamaAPI, LLM, GeminiAPI
@@ -66,6 +67,20 @@ class TestLLM(unittest.TestCase):
             # Catch potential API call errors (e.g., connection, authentication within genai)
             self.fail(f"GeminiAPI make_llm_call failed with exception: {e}")
 
+    @patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+    def test__openai_chat_api_reuses_client(self):
+        with patch("dsrag.llm.openai") as mock_openai:
+            mock_client = MagicMock()
+            mock_client.chat.completions.create.return_value.choices[0].message.content = " response "
+            mock_openai.OpenAI.return_value = mock_client
+
+            chat_api = OpenAIChatAPI()
+            for _ in range(3):
+                self.assertEqual(chat_api.make_llm_call([{"role": "user", "content": "Hi"}]), "response")
+
+        mock_openai.OpenAI.assert_called_once()
+        self.assertEqual(mock_client.chat.completions.create.call_count, 3)
+
     def test__save_and_load_from_dict(self):
         chat_api = OpenAIChatAPI(temperature=0.5, max_tokens=2000)
         config = chat_api.to_dict()
@@ -0,0 +1,44 @@
+import os
+import sys
+import json
+import logging
+import unittest
+import numpy as np
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from dsrag.log_format import JsonFormatter
+
+
+class TestJsonFormatter(unittest.TestCase):
+    def make_record(self):
+        logger = logging.getLogger("dsrag.query")
+        return logger.makeRecord(
+            "dsrag.query", logging.DEBUG, __file__, 1, "RSE complete %s", ("now",), None,
+            extra={"kb_id": "kb123", "segment_scores": [0.5, 0.25], "duration_s": np.float64(0.1), "reranker": object()},
+        )
+
+    def check_log_entry(self, log_entry):
+        self.assertEqual(log_entry["name"], "dsrag.query")
+        self.assertEqual(log_entry["level"], "DEBUG")
+        self.assertEqual(log_entry["message"], "RSE complete now")
+        self.assertEqual(log_entry["kb_id"], "kb123")
+        self.assertEqual(log_entry["segment_scores"], [0.5, 0.25])
+        self.assertAlmostEqual(log_entry["duration_s"], 0.1)
+        # values that can't be serialized are converted with str()
+        self.assertIsInstance(log_entry["reranker"], str)
+        # standard record attributes aren't repeated
+        self.assertNotIn("args", log_entry)
+        self.assertNotIn("lineno", log_entry)
+
+    def test__format(self):
+        self.check_log_entry(json.loads(JsonFormatter().format(self.make_record())))
+
+    def test__format_without_orjson(self):
+        with patch("dsrag.log_format.orjson.is_available", return_value=False):
+            self.check_log_entry(json.loads(JsonFormatter().format(self.make_record())))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import shutil
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from dsrag.metadata import LocalMetadataStorage
+from dsrag.utils.imports import orjson
+
+
+class TestLocalMetadataStorage(unittest.TestCase):
+    def setUp(self):
+        self.storage_directory = os.path.expanduser("~/test__metadata_dsRAG")
+        if os.path.exists(self.storage_directory):
+            shutil.rmtree(self.storage_directory)
+        self.storage = LocalMetadataStorage(self.storage_directory)
+        self.data = {"title": "Résumé – 日本語", "components": {"chunk_db": {"kb_id": "test_kb"}}, "count": 3}
+
+    def tearDown(self):
+        if os.path.exists(self.storage_directory):
+            shutil.rmtree(self.storage_directory)
+
+    def read_file(self):
+        with open(self.storage.get_metadata_path("test_kb"), "rb") as f:
+            return f.read()
+
+    @unittest.skipIf(not orjson.is_available(), "orjson is not installed")
+    def test__orjson_and_json_write_the_same_file(self):
+        self.storage.save(self.data, "test_kb")
+        orjson_file = self.read_file()
+        with patch("dsrag.metadata.orjson.is_available", return_value=False):
+            self.assertEqual(self.storage.load("test_kb"), self.data)
+            self.storage.save(self.data, "test_kb")
+        self.assertEqual(self.read_file(), orjson_file)
+        self.assertEqual(self.storage.load("test_kb"), self.data)
+
+    def test__non_ascii_round_trip_without_orjson(self):
+        with patch("dsrag.metadata.orjson.is_available", return_value=False):
+            self.storage.save(self.data, "test_kb")
+            self.assertEqual(self.storage.load("test_kb"), self.data)
+        # non-ASCII text is written as UTF-8, not escaped
+        self.assertIn("Résumé".encode("utf-8"), self.read_file())
+
+
+if __name__ == "__main__":
+    unittest.main()
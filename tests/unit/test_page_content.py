@@ -0,0 +1,61 @@
+import os
+import sys
+import shutil
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+from dsrag.dsparse.file_parsing.file_system import LocalFileSystem
+from dsrag.chat.citations import convert_elements_to_page_content
+
+
+class TestPageContent(unittest.TestCase):
+    def setUp(self):
+        self.base_path = os.path.expanduser("~/dsrag_test_page_content")
+        self.kb_id = "test_kb"
+        self.doc_id = "test_doc"
+        self.file_system = LocalFileSystem(base_path=self.base_path)
+        self.file_system.create_directory(self.kb_id, self.doc_id)
+
+    def tearDown(self):
+        if os.path.exists(self.base_path):
+            shutil.rmtree(self.base_path)
+
+    def test__convert_elements_to_page_content(self):
+        self.assertFalse(self.file_system.page_content_exists(self.kb_id, self.doc_id))
+
+        elements = [
+            {"type": "NarrativeText", "content": "a", "page_number": 1},
+            {"type": "NarrativeText", "content": "b", "page_number": 1},
+            {"type": "NarrativeText", "content": "c", "page_number": 2},
+            {"type": "NarrativeText", "content": "d", "page_number": 1},  # out of page order
+        ]
+        # any iterable of elements works, not just a list
+        convert_elements_to_page_content(iter(elements), self.kb_id, self.doc_id, self.file_system)
+
+        self.assertTrue(self.file_system.page_content_exists(self.kb_id, self.doc_id))
+        self.assertEqual(self.file_system.load_page_content(self.kb_id, self.doc_id, 1), "a\nb\nd")
+        self.assertEqual(self.file_system.load_page_content(self.kb_id, self.doc_id, 2), "c")
+
+    def test__interrupted_conversion_is_not_complete(self):
+        # pages saved by a conversion that stopped part way through, before the last page
+        self.file_system.save_page_content(self.kb_id, self.doc_id, 1, "a")
+        self.file_system.save_page_content(self.kb_id, self.doc_id, 2, "b")
+        self.assertFalse(self.file_system.page_content_exists(self.kb_id, self.doc_id))
+
+        elements = [
+            {"type": "NarrativeText", "content": "a", "page_number": 1},
+            {"type": "NarrativeText", "content": "b", "page_number": 2},
+            {"type": "NarrativeText", "content": "c", "page_number": 3},
+        ]
+        convert_elements_to_page_content(elements, self.kb_id, self.doc_id, self.file_system)
+        self.assertTrue(self.file_system.page_content_exists(self.kb_id, self.doc_id))
+        self.assertEqual(self.file_system.load_data(self.kb_id, self.doc_id, "page_content_complete"), {"num_pages": 3})
+
+    def test__no_page_numbers(self):
+        convert_elements_to_page_content([{"type": "NarrativeText", "content": "a"}], self.kb_id, self.doc_id, self.file_system)
+        convert_elements_to_page_content([], self.kb_id, self.doc_id, self.file_system)
+        self.assertFalse(self.file_system.page_content_exists(self.kb_id, self.doc_id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import sys
+import shutil
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from dsrag.embedding import Embedding
+from dsrag.knowledge_base import KnowledgeBase
+from dsrag.llm import LLM
+from dsrag.reranker import NoReranker
+
+
+class KeywordEmbedding(Embedding):
+    """Deterministic embedding based on keyword counts, recording every call"""
+    keywords = ["apple", "banana", "cherry", "durian"]
+
+    def __init__(self, dimension: int = 4):
+        super().__init__(dimension)
+        self.calls = []
+
+    def get_embeddings(self, text, input_type=None):
+        self.calls.append((list(text), input_type))
+        return [[float(t.lower().count(k)) + 0.01 for k in self.keywords] for t in text]
+
+
+class UnusedLLM(LLM):
+    """AutoContext model for tests that never make LLM calls"""
+    def make_llm_call(self, chat_messages):
+        raise AssertionError("unexpected LLM call")
+
+
+class TestQuery(unittest.TestCase):
+    def setUp(self):
+        self.storage_directory = "~/test__query_dsRAG"
+        resolved_test_storage_directory = os.path.expanduser(self.storage_directory)
+        if os.path.exists(resolved_test_storage_directory):
+            shutil.rmtree(resolved_test_storage_directory)
+
+        self.embedding_model = KeywordEmbedding()
+        self.kb = KnowledgeBase(
+            kb_id="test_kb",
+            storage_directory=self.storage_directory,
+            embedding_model=self.embedding_model,
+            reranker=NoReranker(),
+            auto_context_model=UnusedLLM(),
+            save_metadata_to_disk=False,
+        )
+        # no LLM calls: no semantic sectioning, no generated title or summary
+        documents = [
+            {
+                "doc_id": fruit,
+                "text": "\n".join(f"{fruit.capitalize()} fact {i}: the {fruit} is a fruit." for i in range(40)),
+                "auto_context_config": {"use_generated_title": False, "get_document_summary": False},
+                "semantic_sectioning_config": {"use_semantic_sectioning": False},
+                "chunking_config": {"chunk_size": 200, "min_length_for_chunking": 100},
+            }
+            for fruit in KeywordEmbedding.keywords
+        ]
+        self.kb.add_documents(documents, show_progress=False, rate_limit_pause=0)
+        self.embedding_model.calls.clear()
+        return super().setUp()
+
+    def tearDown(self):
+        resolved_test_storage_directory = os.path.expanduser(self.storage_directory)
+        if os.path.exists(resolved_test_storage_directory):
+            shutil.rmtree(resolved_test_storage_directory)
+        return super().tearDown()
+
+    def test__queries_are_embedded_in_one_call(self):
+        queries = ["apple", "cherry", "durian"]
+        all_ranked_results = self.kb._get_all_ranked_results(queries)
+
+        self.assertEqual(self.embedding_model.calls, [(queries, "query")])
+        # results stay in query order
+        for query, ranked_results in zip(queries, all_ranked_results):
+            self.assertEqual(ranked_results[0]["metadata"]["doc_id"], query)
+
+    def test__query_embeddings_are_cached(self):
+        self.kb._get_all_ranked_results(["apple", "cherry"])
+        self.kb._get_all_ranked_results(["cherry", "durian", "durian"])
+        # only the uncached query is embedded, once
+        self.assertEqual(self.embedding_model.calls, [(["apple", "cherry"], "query"), (["durian"], "query")])
+
+        with patch("dsrag.knowledge_base.QUERY_EMBEDDING_CACHE_TTL", 0):
+            self.kb._search("apple", top_k=5)
+        self.assertEqual(self.embedding_model.calls[-1], (["apple"], "query"))
+
+        self.kb.invalidate_query_cache()
+        self.kb._search("cherry", top_k=5)
+        self.assertEqual(self.embedding_model.calls[-1], (["cherry"], "query"))
+
+    def test__query_returns_segments_from_the_matching_document(self):
+        results = self.kb.query(["banana"])
+        self.assertGreater(len(results), 0)
+        self.assertEqual(results[0]["doc_id"], "banana")
+        self.assertIn("Banana fact", results[0]["content"])
+        self.assertEqual(results[0]["text"], results[0]["content"])
+        self.assertIn("segment_page_start", results[0])
+
+    def test__single_query_runs_on_the_calling_thread(self):
+        search_with_vector = self.kb._search_with_vector
+        threads = []
+        self.kb._search_with_vector = lambda *args: threads.append(threading.current_thread()) or search_with_vector(*args)
+
+        all_ranked_results = self.kb._get_all_ranked_results(["durian"])
+        self.assertEqual(threads, [threading.current_thread()])
+        self.assertEqual(all_ranked_results[0][0]["metadata"]["doc_id"], "durian")
+
+        # several queries still run on the query thread pool
+        self.kb._get_all_ranked_results(["apple", "banana"])
+        self.assertTrue(all(thread.name.startswith("dsrag-query") for thread in threads[1:]))
+
+    def test__aquery(self):
+        results = asyncio.run(self.kb.aquery(["banana"]))
+        self.assertEqual(results, self.kb.query(["banana"]))
+
+    def test__text_segment_page_numbers_come_from_the_chunk_rows(self):
+        with patch.object(self.kb.chunk_db, "get_chunk_page_numbers") as mock_get_chunk_page_numbers:
+            results = self.kb.query(["cherry"])
+        mock_get_chunk_page_numbers.assert_not_called()
+        self.assertGreater(len(results), 0)
+        # the test documents have no page numbers
+        self.assertIsNone(results[0]["segment_page_start"])
+        self.assertIsNone(results[0]["segment_page_end"])
+
+    def test__segment_headers_are_looked_up_once_per_document(self):
+        get_document_title = self.kb.chunk_db.get_document_title
+        calls = []
+        self.kb.chunk_db.get_document_title = lambda doc_id, chunk_index: calls.append(doc_id) or get_document_title(doc_id, chunk_index)
+
+        # a long query result has several segments from each document
+        results = self.kb.query(["apple banana"], rse_params={"max_length": 2, "minimum_value": 0, "irrelevant_chunk_penalty": 0})
+        doc_ids = set(r["doc_id"] for r in results)
+        self.assertGreater(len(results), len(doc_ids))
+        # segments are retrieved concurrently, so two segments of a document may both look up its header
+        self.assertEqual(set(calls), doc_ids)
+        self.assertLessEqual(len(calls), len(results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from dsrag.rse import get_chunk_value, get_meta_document, get_relevance_values, get_relevant_segment_info
+
+
+def make_result(doc_id, chunk_index, similarity, chunk_length=100):
+    return {
+        "metadata": {"doc_id": doc_id, "chunk_index": chunk_index, "chunk_text": "x" * chunk_length},
+        "similarity": similarity,
+    }
+
+
+class TestRSE(unittest.TestCase):
+    def setUp(self):
+        self.all_ranked_results = [
+            [make_result("doc_a", 2, 0.9), make_result("doc_b", 0, 0.8, chunk_length=1400), make_result("doc_a", 0, 0.5)],
+            [make_result("doc_b", 1, 0.7), make_result("doc_c", 4, 0.6)],
+        ]
+        return super().setUp()
+
+    def test__get_meta_document(self):
+        document_splits, document_start_points, unique_document_ids = get_meta_document(
+            self.all_ranked_results, top_k_for_document_selection=1
+        )
+        # doc_c isn't the top result of either query
+        self.assertEqual(sorted(unique_document_ids), ["doc_a", "doc_b"])
+        lengths = {"doc_a": 3, "doc_b": 2}
+        start = 0
+        for document_id, split in zip(unique_document_ids, document_splits):
+            self.assertEqual(document_start_points[document_id], start)
+            start += lengths[document_id]
+            self.assertEqual(split, start)
+
+    def test__get_relevance_values(self):
+        document_splits, document_start_points, unique_document_ids = get_meta_document(
+            self.all_ranked_results, top_k_for_document_selection=1
+        )
+        all_relevance_values = get_relevance_values(
+            self.all_ranked_results, document_splits[-1], document_start_points, unique_document_ids,
+            irrelevant_chunk_penalty=0.2, decay_rate=30,
+        )
+        self.assertEqual(len(all_relevance_values), 2)
+
+        # the values match the per-chunk definition, with long chunks scaled up by their length
+        for ranked_results, relevance_values in zip(self.all_ranked_results, all_relevance_values):
+            self.assertEqual(len(relevance_values), document_splits[-1])
+            expected = [get_chunk_value({}, 0.2, 30)] * document_splits[-1]
+            for rank, result in enumerate(ranked_results):
+                document_id = result["metadata"]["doc_id"]
+                if document_id not in document_start_points:
+                    continue
+                value = get_chunk_value({"rank": rank, "absolute_relevance_value": result["similarity"]}, 0.2, 30)
+                chunk_length = len(result["metadata"]["chunk_text"])
+                index = document_start_points[document_id] + result["metadata"]["chunk_index"]
+                expected[index] = value * max(chunk_length, 700) / 700
+            for value, expected_value in zip(relevance_values, expected):
+                self.assertAlmostEqual(value, expected_value)
+
+    def test__get_relevant_segment_info(self):
+        document_splits = [3, 5, 9]
+        document_start_points = {"doc_a": 0, "doc_b": 3, "doc_c": 5}
+        segment_info = get_relevant_segment_info(
+            best_segments=[(5, 7), (0, 2), (3, 5)],
+            scores=[0.9, 0.8, 0.7],
+            document_splits=document_splits,
+            document_start_points=document_start_points,
+            unique_document_ids=["doc_a", "doc_b", "doc_c"],
+        )
+        self.assertEqual(segment_info, [
+            {"doc_id": "doc_c", "chunk_start": 0, "chunk_end": 2, "score": 0.9},
+            {"doc_id": "doc_a", "chunk_start": 0, "chunk_end": 2, "score": 0.8},
+            {"doc_id": "doc_b", "chunk_start": 0, "chunk_end": 2, "score": 0.7},
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
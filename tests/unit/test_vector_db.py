@@ -17,6 +17,7 @@ from dsrag.database.vector import (
     PineconeDB
 )
 from dsrag.database.vector.types import ChunkMetadata
+from dsrag.database.vector.basic_db import cosine_similarities
 
 
 class TestVectorDB(unittest.TestCase):
@@ -136,6 +137,41 @@ class TestVectorDB(unittest.TestCase):
         self.assertIsInstance(vector_db_instance, BasicVectorDB)
         self.assertEqual(vector_db_instance.kb_id, "test_db")
 
+    def test__cosine_similarities(self):
+        vectors = np.array([[1, 0], [3, 4], [0, 0]], dtype=np.float32)
+        similarities = cosine_similarities([2, 0], vectors)
+        np.testing.assert_allclose(similarities, [1.0, 0.6, 0.0], rtol=1e-6)
+        # quantized rows give the same similarities without their scales
+        np.testing.assert_allclose(cosine_similarities([2, 0], (vectors * 25).astype(np.int8)), [1.0, 0.6, 0.0], rtol=1e-6)
+
+    def test__int8_quantization(self):
+        db = BasicVectorDB(self.kb_id, self.storage_directory, quantization="int8")
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(20, 16)).astype(np.float32)
+        metadata = [
+            {"doc_id": str(i), "chunk_index": 0, "chunk_header": "", "chunk_text": ""}
+            for i in range(20)
+        ]
+        db.add_vectors(list(vectors), metadata)
+        self.assertEqual(db.vectors[0].dtype, np.int8)
+
+        results = db.search(vectors[3], top_k=1)
+        self.assertEqual(results[0]["metadata"]["doc_id"], "3")
+        self.assertGreaterEqual(results[0]["similarity"], 0.99)
+        # searching doesn't expand the stored vectors back to float32
+        self.assertEqual(db._search_arrays[0].dtype, np.int8)
+
+        # the scales are saved with the vectors, and a store can be reopened without quantization
+        new_db = VectorDB.from_dict(db.to_dict())
+        self.assertEqual(new_db.quantization, "int8")
+        self.assertEqual(len(new_db.vector_scales), 20)
+        unquantized_db = BasicVectorDB(self.kb_id, self.storage_directory)
+        self.assertEqual(unquantized_db.vectors[0].dtype, np.float32)
+        np.testing.assert_allclose(unquantized_db.vectors[3], vectors[3], atol=0.05)
+
+        with self.assertRaises(ValueError):
+            BasicVectorDB(self.kb_id, self.storage_directory, quantization="int4")
+
     def test__assertion_error_on_mismatched_input_lengths(self):
         db = BasicVectorDB(self.kb_id, self.storage_directory)
         vectors = [np.array([1, 0])]
@@ -244,6 +280,49 @@ class TestVectorDB(unittest.TestCase):
         results = db.search(query_vector, top_k=3)
         self.assertEqual(len(results), 2)
 
+    def test__search_with_metadata_filter(self):
+        db = BasicVectorDB(self.kb_id, self.storage_directory)
+        vectors = [np.array([1, 0]), np.array([1, 0.1]), np.array([0, 1]), np.array([1, 0.2])]
+        metadata: Sequence[ChunkMetadata] = [
+            {"doc_id": str(i + 1), "chunk_index": i, "chunk_header": "Header", "chunk_text": "Text"}
+            for i in range(4)
+        ]
+        db.add_vectors(vectors, metadata)
+        query_vector = np.array([1, 0])
+
+        for use_faiss in [False, True]:
+            db.use_faiss = use_faiss
+            metadata_filter = {"field": "doc_id", "operator": "equals", "value": "3"}
+            results = db.search(query_vector, top_k=4, metadata_filter=metadata_filter)
+            self.assertEqual([r["metadata"]["doc_id"] for r in results], ["3"])
+
+            # results are still ranked by similarity, and top_k applies after filtering
+            metadata_filter = {"field": "doc_id", "operator": "in", "value": ["1", "3", "4"]}
+            results = db.search(query_vector, top_k=2, metadata_filter=metadata_filter)
+            self.assertEqual([r["metadata"]["doc_id"] for r in results], ["1", "4"])
+
+            metadata_filter = {"field": "chunk_index", "operator": "greater_than_equals", "value": 1}
+            results = db.search(query_vector, top_k=4, metadata_filter=metadata_filter)
+            self.assertEqual([r["metadata"]["doc_id"] for r in results], ["2", "4", "3"])
+
+            metadata_filter = {"field": "doc_id", "operator": "equals", "value": "missing"}
+            self.assertEqual(db.search(query_vector, top_k=4, metadata_filter=metadata_filter), [])
+
+    def test__search_ranks_top_k(self):
+        db = BasicVectorDB(self.kb_id, self.storage_directory)
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(50, 8)).astype(np.float32)
+        metadata: Sequence[ChunkMetadata] = [
+            {"doc_id": str(i), "chunk_index": i, "chunk_header": "Header", "chunk_text": "Text"}
+            for i in range(50)
+        ]
+        db.add_vectors(list(vectors), metadata)
+        query_vector = rng.normal(size=8)
+
+        similarities = vectors @ query_vector / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query_vector))
+        results = db.search(query_vector, top_k=5)
+        self.assertEqual([r["metadata"]["chunk_index"] for r in results], list(np.argsort(-similarities)[:5]))
+
 
 @unittest.skipIf(os.environ.get('GITHUB_ACTIONS') == 'true', "ChromaDB is not available on GitHub Actions")
 class TestChromaDB(unittest.TestCase):